@@ -0,0 +1,27 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: records.py
+Description: Entry point of the game import and export, see src/records.py.
+"""
+import os
+
+os.environ["PYGOBANG_RESPATH"] = os.path.join(os.path.dirname(__file__), "res/")
+
+from src.records import main
+
+if __name__ == "__main__":
+    main()
@@ -15,16 +15,37 @@ You should have received a copy of the GNU General Public License along with
 this program. If not, see <http://www.gnu.org/licenses/>.
 
 File: src/ai.py
-Description: 🤖AI part of pyGobang.
+Description: 
+    🤖AI part of pyGobang, the greedy BoardAI, the alpha-beta search and the 
+    Monte Carlo tree search.
 Copyright statement: 
     The partial code of Minmax algorithm is modified from a open source project 
     GoBang-python-homework (https://github.com/Xshellye/GoBang-python-homework) 
     Thanks to their genius work!
 """
 
-from typing import Tuple
+from functools import lru_cache
+from typing import Callable, List, NamedTuple, Tuple
+import math
+import random
+import threading
+import time
+import numpy as np
 
-from src.core import Board
+from src.constants import (
+    AI_HARD_TIME_LIMIT,
+    AI_MAX_DEPTH,
+    AI_MCTS_EXPLORATION,
+    AI_MCTS_PLAYOUTS,
+    AI_PONDER_REPLIES,
+    AI_SEARCH_BRANCH,
+    AI_TABLE_SIZE,
+    AI_TIME_LIMIT,
+)
+from src.book import get_book
+from src.core import CANDIDATE_DISTANCE, DIRECTIONS, Board
+from src.pattern import EDGE, GRADE_TABLE, GRADES, OFFSETS, WINDOW
+from src.threat import ThreatSolver
 
 LEFT_RIGHT = 0
 TOP_BOTTOM = 1
@@ -33,207 +54,1167 @@ RIGHTTOP_LEFTBOTTOM = 3
 
 
 class BoardAI:
-    def __init__(self, chessdata):
-        self._chess_data = chessdata  # 1 for self, 0 for empty, -1 for opponent
-        self._row = len(chessdata)
-        self._col = len(chessdata[0])
+    def __init__(self, board: Board):
+        self._board = board
 
-    def get_grade(self, point, index):
+    def get_grade(self, point, side):
+        # One lookup per direction, see src.pattern for the grades.
+        grades = GRADES[side]
+        line_code = self._board.line_code
         grade = 0
         for k in range(4):
-            count1, count2, wall = self.count(point, index, k)
-            tempGrade = 0
-            if count1 >= 5:
+            tempGrade = grades[line_code(point[0], point[1], k)]
+            if tempGrade >= 100000:
                 return 100000
-            elif count1 == 4 and count2 >= 5:
-                tempGrade = 1600
-            elif count1 == 4 and count2 < 5:
-                tempGrade = 20
-            elif count1 == 3 and count2 >= 5:
-                tempGrade = 400
-            elif count1 == 3 and count2 < 5:
-                tempGrade = 10
-
-            elif count1 == 2 and count2 >= 5:
-                tempGrade = 100
-            elif count1 == 2 and count2 < 5:
-                tempGrade = 4
-            elif count1 == 1 and count2 >= 5:
-                tempGrade = 10
-            elif count1 == 1 and count2 < 5:
-                tempGrade = 1
-
-            if wall:
-                grade += (tempGrade) * 0.3
-            else:
-                grade += tempGrade
+            grade += tempGrade
         return grade
 
-    def down_chess(self, index):
-        MaxGrade = 0
-        MaxPoint = None
-        point = (0, 0)
-        for i in range(self._row):
-            for j in range(self._col):
-                if self._chess_data[i][j] != 0:
+    def get_grades(self):
+        """Grade every position of the board for both sides at once.
+
+        Returns:
+            ndarray: 
+                grades[side, column, row] is get_grade((column, row), side), 
+                which is meaningless for the occupied positions.
+        """
+        grades = GRADE_TABLE[:, pattern_codes(self._board.board)]
+        fives = (grades >= 100000).any(axis=1)
+        grades = grades.sum(axis=1)  # Summed in the order of get_grade.
+        grades[fives] = 100000
+        return grades
+
+    def down_chess(self, side):
+        grades = self.get_grades()
+        myGrade, enemyGrade = grades[side], grades[1 - side]
+        myGrade[myGrade >= 100000] = 199999
+        myGrade[myGrade >= 1600] += 1201
+        myGrade[myGrade >= 400] += 301
+        myGrade[myGrade >= 100] += 31
+        grade = np.maximum(myGrade, enemyGrade)
+        # Only the places near the pieces are graded, all of them on an empty
+        # board. The first best place in the row-major order wins the tie.
+        grade[~candidate_mask(self._board.board)] = 0
+        MaxPoint = np.unravel_index(np.argmax(grade), grade.shape)
+        if grade[MaxPoint] <= 0:
+            return None
+        return int(MaxPoint[0]), int(MaxPoint[1])
+
+
+def pattern_codes(cells: np.ndarray) -> np.ndarray:
+    """The pattern codes of every position, see src.pattern.
+
+    Args:
+        cells (ndarray): The board, indexed by [column, row].
+
+    Returns:
+        ndarray: 
+            codes[direction, column, row] is the pattern code of the position
+            along the direction, the same as Board.line_code.
+    """
+    width, height = cells.shape
+    padded = np.full((width + 2 * WINDOW, height + 2 * WINDOW), EDGE, np.intp)
+    padded[WINDOW:-WINDOW, WINDOW:-WINDOW] = cells + 1
+    indices, weights = _pattern_indices(cells.shape)
+    return padded.ravel()[indices] @ weights
+
+
+@lru_cache
+def _pattern_indices(board_size: Tuple[int, int]):
+    """The gather indices of pattern_codes for the board size.
+
+    Returns:
+        Tuple[ndarray, ndarray]: 
+            indices[direction, column, row, i] is the index of the i-th cell 
+            of the code in the board padded by WINDOW and flattened, and 
+            weights[i] is its weight.
+    """
+    width, height = board_size
+    stride = height + 2 * WINDOW
+    columns, rows = np.indices(board_size)
+    centres = (columns + WINDOW) * stride + rows + WINDOW
+    indices = np.empty((len(DIRECTIONS), width, height, len(OFFSETS)), int)
+    for d, (dc, dr) in enumerate(DIRECTIONS):
+        for i, (step, _) in enumerate(OFFSETS):
+            indices[d, :, :, i] = centres + step * (dc * stride + dr)
+    weights = np.array([weight for _, weight in OFFSETS], np.intp)
+    return indices, weights
+
+
+def candidate_mask(cells: np.ndarray) -> np.ndarray:
+    """The blank positions near the pieces, see Board.candidates.
+
+    Args:
+        cells (ndarray): The board, indexed by [column, row].
+
+    Returns:
+        ndarray: 
+            The boolean mask of the candidates, or of all the blank positions
+            if there is no piece yet.
+    """
+    blank = cells == -1
+    if blank.all():
+        return blank
+    width, height = cells.shape
+    reach = CANDIDATE_DISTANCE
+    padded = np.zeros((width + 2 * reach, height + 2 * reach), bool)
+    padded[reach:-reach, reach:-reach] = ~blank
+    near = padded[:width].copy()
+    for i in range(1, 2 * reach + 1):
+        near |= padded[i : i + width]
+    padded, near = near, near[:, :height].copy()
+    for i in range(1, 2 * reach + 1):
+        near |= padded[:, i : i + height]
+    return near & blank
+
+
+def get_move(board: Board) -> Tuple[int, int]:
+    assert len(board.available_place) > 0
+    # The grade of the opponent is the boosted one, which keeps the original
+    # defensive style of the robot.
+    return BoardAI(board).down_chess(int(not board.current_side))
+
+
+WIN_SCORE = 10**7  # Score of a five, less the plies needed to reach it.
+
+
+class SearchResult(NamedTuple):
+    """The result of a search.
+
+    Attributes:
+        move: The best move found.
+        score: The score of the move, from the view of the side to move.
+        depth: The depth of the deepest completed iteration.
+        pv: The principal variation, which starts with the move.
+        nodes: The number of the searched nodes.
+        nps: The searched nodes per second.
+    """
+
+    move: Tuple[int, int]
+    score: float
+    depth: int
+    pv: List[Tuple[int, int]]
+    nodes: int
+    nps: float
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search once the time budget is used up."""
+
+
+class SearchController:
+    """The time management and the cancellation of one search.
+
+    The search gets `time_limit_ms` for the move: no new iteration starts once
+    half of it is gone, as the next one would hardly finish in time. The 
+    running iteration is dropped at the hard deadline, or as soon as stop() 
+    is called from any thread. The result of the deepest completed iteration
+    is kept in `best` all along.
+
+    Attributes:
+        time_limit_ms: The time allocated to the move, in milliseconds.
+        hard_limit_ms: The hard deadline, in milliseconds.
+        event: The stop flag, which is set by stop().
+        best: The best-so-far SearchResult, None before the first iteration.
+        stopped: Whether the search should stop now.
+
+    Functions:
+        start(): Start the clock, called by the search.
+        stop(): Ask the search to stop.
+        can_deepen(): Whether the next iteration is worth starting.
+        update(result): Record the result of a completed iteration.
+    """
+
+    def __init__(
+        self,
+        time_limit_ms: float = None,
+        hard_limit_ms: float = None,
+        event: threading.Event = None,
+    ) -> None:
+        """Initialization to the controller.
+
+        Args:
+            time_limit_ms (float, optional): 
+                The time allocated to the move. Defaults to AI_TIME_LIMIT.
+            hard_limit_ms (float, optional): 
+                The hard deadline. Defaults to AI_HARD_TIME_LIMIT, and never 
+                earlier than the allocated time.
+            event (threading.Event, optional): 
+                The stop flag, or any object with set() and is_set(), such as
+                one shared with the other processes. Defaults to a new one.
+        """
+        if time_limit_ms == None:
+            time_limit_ms = AI_TIME_LIMIT
+        if hard_limit_ms == None:
+            hard_limit_ms = AI_HARD_TIME_LIMIT
+        self.time_limit_ms = time_limit_ms
+        self.hard_limit_ms = max(hard_limit_ms, time_limit_ms)
+        self.event = threading.Event() if event == None else event
+        self.best = None
+        self._start = None
+
+    def start(self) -> None:
+        """Start the clock, called by the search."""
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        """Ask the search to stop, from any thread."""
+        self.event.set()
+
+    def _elapsed_ms(self) -> float:
+        if self._start == None:
+            return 0
+        return (time.perf_counter() - self._start) * 1000
+
+    @property
+    def stopped(self) -> bool:
+        """Whether the search should stop now.
+
+        Returns:
+            bool: True once stopped, or past the hard deadline.
+        """
+        return self.event.is_set() or self._elapsed_ms() > self.hard_limit_ms
+
+    def can_deepen(self) -> bool:
+        """Whether the next iteration is worth starting.
+
+        Returns:
+            bool: False once stopped, or past half of the allocated time.
+        """
+        return not self.stopped and self._elapsed_ms() < self.time_limit_ms / 2
+
+    def update(self, result: "SearchResult") -> None:
+        """Record the result of a completed iteration as the best-so-far."""
+        self.best = result
+
+
+class TranspositionTable:
+    """Fixed-size transposition table keyed by the Zobrist hash.
+
+    The entries live in preallocated arrays of buckets, each bucket holds a 
+    depth-preferred slot, which keeps the deepest search of the bucket, and 
+    an always-replace slot, which keeps the latest one.
+
+    Attributes:
+        hits: The number of probes finding their position.
+        misses: The number of probes not finding their position.
+        collisions: The misses whose bucket was kept by other positions.
+
+    Functions:
+        probe(key): Look up the entry of the position.
+        store(key, depth, flag, score, move): Save the entry of the position.
+        clear(): Empty the table and reset the counters.
+    """
+
+    EXACT = 0  # The score is exact.
+    LOWER = 1  # The score is a lower bound, the search failed high.
+    UPPER = 2  # The score is an upper bound, the search failed low.
+
+    # Bytes of one slot: key, score, move, depth and flag.
+    _ENTRY_SIZE = 8 + 8 + 4 + 2 + 1
+
+    def __init__(self, size_mb: float = None) -> None:
+        """Initialization to the table.
+
+        Args:
+            size_mb (float, optional): 
+                The memory cap of the table in MB, the number of buckets is 
+                the largest power of 2 within it. Defaults to AI_TABLE_SIZE.
+        """
+        if size_mb == None:
+            size_mb = AI_TABLE_SIZE
+        buckets = max(1, int(size_mb * 2**20) // (2 * self._ENTRY_SIZE))
+        buckets = 1 << buckets.bit_length() - 1
+        self._mask = buckets - 1
+        self._keys = np.zeros((buckets, 2), dtype=np.uint64)
+        self._scores = np.zeros((buckets, 2), dtype=np.float64)
+        self._moves = np.zeros((buckets, 2), dtype=np.int32)
+        self._depths = np.zeros((buckets, 2), dtype=np.int16)
+        self._flags = np.zeros((buckets, 2), dtype=np.int8)
+        self.clear()
+
+    def clear(self) -> None:
+        """Empty the table and reset the counters."""
+        self._depths.fill(-1)  # Depth -1 marks an empty slot.
+        self.hits = self.misses = self.collisions = 0
+
+    def probe(self, key: int):
+        """Look up the entry of the position.
+
+        Args:
+            key (int): The Zobrist hash of the position.
+
+        Returns:
+            NoneType or Tuple[int, int, float, Tuple[int, int]]: 
+                The depth, flag, score and best move (or None) of the entry, 
+                None if the position is not in the table.
+        """
+        bucket = key & self._mask
+        keys = self._keys[bucket]
+        depths = self._depths[bucket]
+        for slot in (0, 1):
+            if depths[slot] >= 0 and keys[slot] == key:
+                self.hits += 1
+                move = int(self._moves[bucket, slot])
+                return (
+                    int(depths[slot]),
+                    int(self._flags[bucket, slot]),
+                    float(self._scores[bucket, slot]),
+                    None if move < 0 else divmod(move, 1 << 16),
+                )
+        self.misses += 1
+        if depths[0] >= 0 or depths[1] >= 0:
+            self.collisions += 1
+        return None
+
+    def store(
+        self,
+        key: int,
+        depth: int,
+        flag: int,
+        score: float,
+        move: Tuple[int, int] = None,
+    ) -> None:
+        """Save the entry of the position.
+
+        Args:
+            key (int): The Zobrist hash of the position.
+            depth (int): The depth searched.
+            flag (int): EXACT, LOWER or UPPER, the bound type of the score.
+            score (float): The score for the side to move.
+            move (Tuple[int, int], optional): The best move. Defaults to None.
+        """
+        bucket = key & self._mask
+        slot = 1
+        if self._depths[bucket, 0] <= depth or self._keys[bucket, 0] == key:
+            slot = 0
+        self._keys[bucket, slot] = key
+        self._depths[bucket, slot] = depth
+        self._flags[bucket, slot] = flag
+        self._scores[bucket, slot] = score
+        self._moves[bucket, slot] = (
+            -1 if move == None else move[0] << 16 | move[1]
+        )
+
+
+class AlphaBeta:
+    """Negamax search with alpha-beta pruning and iterative deepening.
+
+    The search works on a private copy of the board. Each node only tries the
+    `branch` most promising moves near the pieces, ordered by the grades of
+    BoardAI, and a move completing a five of the opponent must be blocked.
+
+    Functions:
+        run(): Search the position and return the SearchResult.
+        root_moves(): The moves tried at the root.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        time_limit_ms: float = None,
+        max_depth: int = None,
+        branch: int = None,
+        table: TranspositionTable = None,
+        root_moves: List[Tuple[int, int]] = None,
+        controller: SearchController = None,
+    ) -> None:
+        """Initialization to the search.
+
+        Args:
+            board (Board): The position to search, which is left untouched.
+            time_limit_ms (float, optional): 
+                The time budget in milliseconds. Defaults to no limit.
+            max_depth (int, optional): 
+                The deepest iteration. Defaults to AI_MAX_DEPTH.
+            branch (int, optional): 
+                The number of moves tried in each node. Defaults to 
+                AI_SEARCH_BRANCH.
+            table (TranspositionTable, optional): 
+                The transposition table, which may be shared by the searches
+                of one game. Defaults to a new table.
+            root_moves (List[Tuple[int, int]], optional): 
+                Only search these moves at the root, a part of root_moves(), 
+                and leave the threat solver to the caller. Defaults to all 
+                of root_moves().
+            controller (SearchController, optional): 
+                The time management and the stop flag, which replaces 
+                `time_limit_ms`. Defaults to None.
+        """
+        self._board = Board(board.board_size)
+        for move in board.kifu_copy:
+            self._board.place(*move)
+        self._time_limit_ms = time_limit_ms
+        self._max_depth = AI_MAX_DEPTH if max_depth == None else max_depth
+        self._branch = AI_SEARCH_BRANCH if branch == None else branch
+        self._table = TranspositionTable() if table == None else table
+        self._root_moves = root_moves
+        self._controller = controller
+        self._nodes = 0
+        self._deadline = None
+
+    def run(self) -> SearchResult:
+        """Search the position by iterative deepening.
+
+        A position of the opening book is answered by the book at once, 
+        unless the root moves are given.
+
+        Returns:
+            SearchResult: The result of the deepest completed iteration.
+        """
+        assert self._board.winner == None
+        assert len(self._board.available_place) > 0
+        start = time.perf_counter()
+        time_limit_ms = self._time_limit_ms
+        controller = self._controller
+        stop_event = None
+        if controller != None:
+            controller.start()
+            time_limit_ms = controller.time_limit_ms
+            stop_event = controller.event
+        elif time_limit_ms != None:
+            self._deadline = start + time_limit_ms / 1000
+        self._nodes = 0
+
+        if self._root_moves == None:
+            move = get_book().best_move(self._board)
+            if move != None:
+                result = SearchResult(move, 0, 0, [move], 0, 0)
+                if controller != None:
+                    controller.update(result)
+                return result
+
+        moves, score = self._expand()
+        if self._root_moves != None:
+            moves = list(self._root_moves)
+        result = SearchResult(moves[0], score, 0, [moves[0]], 0, 0)
+        sequence = None
+        if score < WIN_SCORE and self._root_moves == None:
+            # A forced win is found far deeper by the threat solver.
+            # A quarter of the time budget, the rest is for the search.
+            solver_limit = None
+            if time_limit_ms != None:
+                solver_limit = time_limit_ms / 4
+            solver = ThreatSolver(
+                self._board, time_limit_ms=solver_limit, stop_event=stop_event
+            )
+            sequence = solver.solve()
+            self._nodes += solver.nodes
+            if sequence != None:
+                result = SearchResult(
+                    sequence[0],
+                    WIN_SCORE - len(sequence) + 1,
+                    len(sequence),
+                    sequence,
+                    0,
+                    0,
+                )
+        if controller != None:
+            controller.update(result)
+        for depth in range(1, self._max_depth + 1):
+            if score >= WIN_SCORE or sequence != None:
+                break
+            if controller != None and depth > 1 and not controller.can_deepen():
+                break
+            try:
+                score, pv = self._negamax(depth, -math.inf, math.inf, 0, moves)
+            except _SearchTimeout:
+                break
+            result = SearchResult(pv[0], score, depth, pv, 0, 0)
+            if controller != None:
+                controller.update(result)
+            if abs(score) >= WIN_SCORE - self._max_depth:
+                break
+            if len(moves) == 1 and self._root_moves == None:
+                break
+            # Search the principal move first in the next iteration.
+            moves.remove(pv[0])
+            moves.insert(0, pv[0])
+
+        elapsed = time.perf_counter() - start
+        return result._replace(
+            nodes=self._nodes, nps=self._nodes / max(elapsed, 1e-9)
+        )
+
+    def root_moves(self) -> List[Tuple[int, int]]:
+        """The moves tried at the root, the best first.
+
+        Returns:
+            List[Tuple[int, int]]: 
+                The most promising moves, or the only move completing a five,
+                or the moves blocking the five of the opponent.
+        """
+        moves, _ = self._expand()
+        return moves
+
+    def _negamax(
+        self,
+        depth: int,
+        alpha: float,
+        beta: float,
+        ply: int,
+        moves: List[Tuple[int, int]] = None,
+    ) -> Tuple[float, List[Tuple[int, int]]]:
+        """Search the current position of the board.
+
+        Args:
+            depth (int): The remaining depth.
+            alpha (float): The lower bound of the window.
+            beta (float): The upper bound of the window.
+            ply (int): The distance to the root.
+            moves (List[Tuple[int, int]], optional): 
+                The ordered moves to try. Defaults to the generated ones.
+
+        Returns:
+            Tuple[float, List[Tuple[int, int]]]: 
+                The score for the side to move, and the principal variation.
+        """
+        self._nodes += 1
+        if self._deadline != None and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+        if self._controller != None and self._controller.stopped:
+            raise _SearchTimeout()
+
+        key = self._board.zobrist_hash
+        entry = self._table.probe(key)
+        table_move = None
+        if entry != None:
+            table_depth, flag, score, table_move = entry
+            score = _score_from_table(score, ply)
+            if moves == None and table_depth >= depth:
+                pv = [] if table_move == None else [table_move]
+                if flag == TranspositionTable.EXACT:
+                    return score, pv
+                if flag == TranspositionTable.LOWER and score >= beta:
+                    return score, pv
+                if flag == TranspositionTable.UPPER and score <= alpha:
+                    return score, pv
+
+        if moves == None:
+            moves, score = self._expand()
+            if score >= WIN_SCORE:
+                self._table.store(
+                    key, 127, TranspositionTable.EXACT, WIN_SCORE, moves[0]
+                )
+                return WIN_SCORE - ply, moves
+            if depth == 0 or len(moves) == 0:
+                self._table.store(key, 0, TranspositionTable.EXACT, score)
+                return score, []
+        if table_move in moves:
+            moves = [table_move] + [x for x in moves if x != table_move]
+
+        alpha_origin = alpha
+        best, best_pv = -math.inf, []
+        for move in moves:
+            self._board.place(*move)
+            try:
+                score, pv = self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                self._board.cancel()
+            score = -score
+            if score > best:
+                best, best_pv = score, [move] + pv
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best <= alpha_origin:
+            flag = TranspositionTable.UPPER
+        elif best >= beta:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+        self._table.store(
+            key, depth, flag, _score_to_table(best, ply), best_pv[0]
+        )
+        return best, best_pv
+
+    def _expand(self) -> Tuple[List[Tuple[int, int]], float]:
+        """Generate the ordered moves and the static score of the position.
+
+        Returns:
+            Tuple[List[Tuple[int, int]], float]: 
+                The moves worth trying, and the score for the side to move, 
+                which is WIN_SCORE if one of the moves completes a five.
+        """
+        side = int(self._board.current_side)
+        mine_grades, theirs_grades = BoardAI(self._board).get_grades().tolist()
+        if side == 1:
+            mine_grades, theirs_grades = theirs_grades, mine_grades
+        grades = []
+        wins, blocks = [], []
+        mine_total = theirs_total = 0
+        for move in self._candidates():
+            mine = mine_grades[move[0]][move[1]]
+            theirs = theirs_grades[move[0]][move[1]]
+            if mine >= 100000:
+                wins.append(move)
+            elif theirs >= 100000:
+                blocks.append(move)
+            grades.append((mine + theirs, move))
+            mine_total += mine
+            theirs_total += theirs
+        if len(wins) > 0:
+            return wins[:1], WIN_SCORE
+        if len(blocks) > 0:
+            return blocks, mine_total - theirs_total
+        grades.sort(key=lambda x: x[0], reverse=True)
+        moves = [move for _, move in grades[: self._branch]]
+        return moves, mine_total - theirs_total
+
+    def _candidates(self) -> List[Tuple[int, int]]:
+        """The empty positions near the pieces, see Board.candidates.
+
+        Returns:
+            List[Tuple[int, int]]: The candidates in the (column, row) order.
+        """
+        board = self._board
+        if len(board.kifu) == 0:
+            return [(board.board_size[0] // 2, board.board_size[1] // 2)]
+        candidates = board.candidates
+        if len(candidates) == 0:
+            candidates = board.available_place
+        return sorted(candidates)
+
+
+def _score_to_table(score: float, ply: int) -> float:
+    """Make a five score relative to the node before saving it to the table."""
+    if score >= WIN_SCORE - 1000:
+        return score + ply
+    if score <= 1000 - WIN_SCORE:
+        return score - ply
+    return score
+
+
+def _score_from_table(score: float, ply: int) -> float:
+    """Make a five score from the table relative to the root again."""
+    if score >= WIN_SCORE - 1000:
+        return score - ply
+    if score <= 1000 - WIN_SCORE:
+        return score + ply
+    return score
+
+
+def search(
+    board: Board,
+    time_limit_ms: float = None,
+    max_depth: int = None,
+    table: TranspositionTable = None,
+    controller: SearchController = None,
+) -> SearchResult:
+    """Search the best move by the alpha-beta search, see AlphaBeta.
+
+    Args:
+        board (Board): The position to search.
+        time_limit_ms (float, optional): 
+            The time budget in milliseconds. Defaults to no limit.
+        max_depth (int, optional): 
+            The deepest iteration. Defaults to AI_MAX_DEPTH.
+        table (TranspositionTable, optional): 
+            The transposition table. Defaults to a new table.
+        controller (SearchController, optional): 
+            The time management and the stop flag. Defaults to None.
+
+    Returns:
+        SearchResult: The best move, its principal variation and statistics.
+    """
+    return AlphaBeta(
+        board, time_limit_ms, max_depth, table=table, controller=controller
+    ).run()
+
+
+class Ponderer:
+    """Search on the opponent's time.
+
+    After its own move, the robot searches the likely replies of the 
+    opponent one by one in a background thread, and keeps the answer to each
+    of them. If the opponent plays one of them, the answer is ready at once.
+    The searches share one transposition table, so that the later replies 
+    reuse the positions of the earlier ones. The table is not used by the 
+    robot's own search, so a reply not predicted gains nothing from it.
+    Another search may be given instead, such as the parallel search over
+    all the cores, which keeps no table.
+
+    Attributes:
+        table: The transposition table shared by the searches.
+
+    Functions:
+        start(board): Start pondering the position, the opponent to move.
+        stop(wait): Stop pondering.
+        result(board): The answer found for the position, if any.
+    """
+
+    def __init__(
+        self,
+        replies: int = None,
+        time_limit_ms: float = None,
+        searcher: Callable[..., SearchResult] = None,
+    ):
+        """Initialization to the ponderer.
+
+        Args:
+            replies (int, optional): 
+                The most replies searched. Defaults to AI_PONDER_REPLIES.
+            time_limit_ms (float, optional): 
+                The time allocated to the answer to each reply. Defaults to 
+                AI_TIME_LIMIT.
+            searcher (Callable[..., SearchResult], optional): 
+                The search of each reply, called as searcher(board, 
+                controller=controller), such as parallel.search. Defaults 
+                to search with the shared table.
+        """
+        self._replies = AI_PONDER_REPLIES if replies == None else replies
+        self._time_limit_ms = time_limit_ms
+        self._searcher = searcher
+        self.table = TranspositionTable()
+        self._results = {}  # Kifu after the reply -> SearchResult.
+        self._thread = None
+        self._controller = None
+        self._stopped = False
+
+    def start(self, board: Board) -> None:
+        """Start pondering the position in the background.
+
+        Args:
+            board (Board): The position, the opponent to move, which is copied.
+        """
+        self.stop()
+        self._results = {}
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._ponder,
+            args=(board.board_size, board.kifu_copy),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop pondering.
+
+        Args:
+            wait (bool, optional): 
+                Whether to wait for the search to leave, within AI_STOP_POLL
+                for the parallel search. Otherwise the next start() waits 
+                for it, so that the UI thread need not. Defaults to True.
+        """
+        self._stopped = True
+        if self._controller != None:
+            self._controller.stop()
+        if not wait or self._thread == None:
+            return
+        if self._thread != threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def result(self, board: Board) -> SearchResult:
+        """The answer found for the position.
+
+        Args:
+            board (Board): The position, after the reply of the opponent.
+
+        Returns:
+            SearchResult: The result of the search, or None if not pondered.
+        """
+        return self._results.get(tuple(board.kifu))
+
+    def _ponder(self, board_size: Tuple[int, int], kifu: List[Tuple]) -> None:
+        board = Board(board_size)
+        for move in kifu:
+            board.place(*move)
+        if board.winner != None or len(board.available_place) == 0:
+            return
+        replies = AlphaBeta(board, table=self.table).root_moves()
+        for reply in replies[: self._replies]:
+            board.place(*reply)
+            try:
+                if board.winner != None or len(board.available_place) == 0:
                     continue
-                point = (i, j)
-                myGrade = self.get_grade(point, index)
-                enemyGrade = self.get_grade(point, -index)
-                if myGrade >= 100000:
-                    myGrade = 199999
-                if myGrade >= 1600:
-                    myGrade += 1201
-                if myGrade >= 400:
-                    myGrade += 301
-                if myGrade >= 100:
-                    myGrade += 31
-                grade = max(myGrade, enemyGrade)
-                if grade > MaxGrade:
-                    MaxGrade = grade
-                    MaxPoint = point
-        self._chess_data[MaxPoint[0]][MaxPoint[1]] = index
-        return MaxPoint
-
-    def count(self, point, index, direction):
-        x, y = point
-        wall = False
-        fg = 0
-        count1 = count2 = 1
-        if direction == LEFT_RIGHT:
-            for i in range(y - 1, -1, -1):
-                if self._chess_data[x][i] == index and fg == 0:
-                    count1 += 1
-                    count2 += 1
-                    if i - 1 > -1 and self._chess_data[x][i - 1] == -index:
-                        wall = True
-                elif self._chess_data[x][i] == 0:
-                    count2 += 1
-                    fg = 1
-                else:
-                    break
-            fg = 0
-            for i in range(y + 1, self._col):
-                if self._chess_data[x][i] == index and fg == 0:
-                    count1 += 1
-                    count2 += 1
-                    if (
-                        i + 1 < self._col
-                        and self._chess_data[x][i + 1] == -index
-                    ):
-                        wall = True
-                elif self._chess_data[x][i] == 0:
-                    count2 += 1
-                    fg = 1
-                else:
-                    break
-        if direction == TOP_BOTTOM:
-            for i in range(x - 1, -1, -1):
-                if self._chess_data[i][y] == index and fg == 0:
-                    count1 += 1
-                    count2 += 1
-                    if i - 1 > -1 and self._chess_data[i - 1][y] == -index:
-                        wall = True
-                elif self._chess_data[i][y] == 0:
-                    count2 += 1
-                    fg = 1
-                else:
-                    break
-            fg = 0
-            for i in range(x + 1, self._row):
-                if self._chess_data[i][y] == index and fg == 0:
-                    count1 += 1
-                    count2 += 1
-                    if (
-                        i + 1 < self._row
-                        and self._chess_data[i + 1][y] == -index
-                    ):
-                        wall = True
-                elif self._chess_data[i][y] == 0:
-                    count2 += 1
-                    fg = 1
-                else:
-                    break
-        if direction == LEFTTOP_RIGHTBOTTOM:
-            n = min(x, y)
-            for i in range(1, n):
-                if self._chess_data[x - i][y - i] == index and fg == 0:
-                    count1 += 1
-                    count2 += 1
-                    if (
-                        x - i - 1 > -1
-                        and y - i - 1 > -1
-                        and self._chess_data[x - i - 1][y - i - 1] == -index
-                    ):
-                        wall = True
-                elif self._chess_data[x - i][y - i] == 0:
-                    count2 += 1
-                    fg = 1
-                else:
-                    break
-            fg = 0
-            n = self._row - max(x, y)
-            for i in range(1, n):
-                if self._chess_data[x + i][y + i] == index and fg == 0:
-                    count1 += 1
-                    count2 += 1
-                    if (
-                        x + i + 1 < n
-                        and y + i + 1 < n
-                        and self._chess_data[x + i + 1][y + i + 1] == -index
-                    ):
-                        wall = True
-                elif self._chess_data[x + i][y + i] == 0:
-                    count2 += 1
-                    fg = 1
-                else:
-                    break
-        if direction == RIGHTTOP_LEFTBOTTOM:
-            n = min(x, self._row - y)
-            for i in range(1, n):
-                if self._chess_data[x - i][y + i] == index and fg == 0:
-                    count1 += 1
-                    count2 += 1
-                    if (
-                        x - i - 1 > -1
-                        and y + i + 1 < n
-                        and self._chess_data[x - i - 1][y + i + 1] == -index
-                    ):
-                        wall = True
-                elif self._chess_data[x - i][y + i] == 0:
-                    count2 += 1
-                    fg = 1
+                controller = SearchController(self._time_limit_ms)
+                self._controller = controller
+                if self._stopped:
+                    return
+                if self._searcher == None:
+                    result = search(
+                        board, table=self.table, controller=controller
+                    )
                 else:
+                    result = self._searcher(board, controller=controller)
+                if controller.event.is_set():
+                    return
+                self._results[tuple(board.kifu)] = result
+            finally:
+                board.cancel()
+
+
+class _RolloutBoard:
+    """A bare board for the playouts of MCTS, which never allocates.
+
+    The cells live in a flat list with a border of EDGE cells, so that the 
+    position (column, row) is the index (column + 1) * stride + row + 1 and
+    the neighbours are fixed offsets. The blank cells next to the pieces are
+    kept in a list with their index in it, for an O(1) random pick and 
+    removal, and the ends of the runs of four are kept as the five points of
+    each side. reset() copies the position back from the snapshot taken by 
+    save() with slice assignments.
+
+    Functions:
+        index(move): The index of the move.
+        move(index): The move of the index.
+        save(): Take the snapshot of the position.
+        reset(): Restore the snapshot of the position.
+        place(index, side): Place one piece, and tell if it makes a five.
+        rollout_move(side, rand): The move of the playout policy.
+        near_moves(): All the blank cells next to the pieces.
+    """
+
+    EDGE = 2
+
+    __slots__ = (
+        "_stride",
+        "_cells",
+        "_near",
+        "_near_index",
+        "_fives",
+        "_saved",
+        "_steps",
+        "_around",
+    )
+
+    def __init__(self, board: Board) -> None:
+        """Initialization to the rollout board.
+
+        Args:
+            board (Board): The position to copy, which is also saved.
+        """
+        width, height = board.board_size
+        self._stride = height + 2
+        size = (width + 2) * self._stride
+        self._cells = [self.EDGE] * size
+        for column in range(width):
+            start = self.index((column, 0))
+            self._cells[start : start + height] = [-1] * height
+        self._near = []
+        self._near_index = [-1] * size
+        self._fives = ([], [])  # Maybe stale, the cell may be taken since.
+        # Steps of the four line directions, see DIRECTIONS.
+        self._steps = [dc * self._stride + dr for dc, dr in DIRECTIONS]
+        self._around = self._steps + [-step for step in self._steps]
+        for i, move in enumerate(board.kifu):
+            self.place(self.index(move), i % 2)
+        self.save()
+
+    def index(self, move: Tuple[int, int]) -> int:
+        """The index of the move."""
+        return (move[0] + 1) * self._stride + move[1] + 1
+
+    def move(self, index: int) -> Tuple[int, int]:
+        """The move of the index."""
+        column, row = divmod(index, self._stride)
+        return column - 1, row - 1
+
+    def save(self) -> None:
+        """Take the snapshot of the position."""
+        self._saved = (
+            self._cells.copy(),
+            self._near.copy(),
+            self._near_index.copy(),
+            self._fives[0].copy(),
+            self._fives[1].copy(),
+        )
+
+    def reset(self) -> None:
+        """Restore the snapshot of the position."""
+        cells, near, near_index, fives_black, fives_white = self._saved
+        self._cells[:] = cells
+        self._near[:] = near
+        self._near_index[:] = near_index
+        self._fives[0][:] = fives_black
+        self._fives[1][:] = fives_white
+
+    def place(self, index: int, side: int) -> bool:
+        """Place one piece, and tell if it makes a five.
+
+        Args:
+            index (int): The index of the blank cell.
+            side (int): 0 or 1 for the black or white side.
+
+        Returns:
+            bool: Whether the piece completes a five.
+        """
+        cells, near, near_index = self._cells, self._near, self._near_index
+        cells[index] = side
+        i = near_index[index]
+        if i >= 0:
+            # Swap with the last one and pop.
+            last = near.pop()
+            if last != index:
+                near[i] = last
+                near_index[last] = i
+            near_index[index] = -1
+        for step in self._around:
+            cell = index + step
+            if cells[cell] == -1 and near_index[cell] < 0:
+                near_index[cell] = len(near)
+                near.append(cell)
+        for step in self._steps:
+            count = 1
+            after = index + step
+            while cells[after] == side:
+                count += 1
+                after += step
+            before = index - step
+            while cells[before] == side:
+                count += 1
+                before -= step
+            if count >= 5:
+                return True
+            if count == 4:
+                for cell in (before, after):
+                    if cells[cell] == -1:
+                        self._fives[side].append(cell)
+        return False
+
+    def rollout_move(self, side: int, rand) -> int:
+        """The move of the playout policy: complete a five, or block the five
+        of the opponent, or else a random blank cell next to the pieces.
+
+        Args:
+            side (int): The side to move.
+            rand: The random() function to use.
+
+        Returns:
+            int: The index of the cell, -1 if there is none.
+        """
+        cells = self._cells
+        for fives in (self._fives[side], self._fives[1 - side]):
+            for cell in fives:
+                if cells[cell] == -1:
+                    return cell
+        near = self._near
+        if len(near) == 0:
+            return -1
+        return near[int(rand() * len(near))]
+
+    def near_moves(self) -> List[int]:
+        """All the blank cells next to the pieces, as a new list."""
+        return self._near.copy()
+
+
+class _Node:
+    """A node of the Monte Carlo tree, reached by the piece on `index`."""
+
+    __slots__ = (
+        "index",
+        "side",
+        "won",
+        "children",
+        "untried",
+        "visits",
+        "wins",
+    )
+
+    def __init__(self, index: int, side: int, won: bool = False) -> None:
+        self.index = index  # Rollout board index of the move.
+        self.side = side  # The side which played the move.
+        self.won = won  # Whether the move completes a five.
+        self.children = []
+        self.untried = None  # Moves not expanded yet, filled on first visit.
+        self.visits = 0
+        self.wins = 0.0  # Results for `side`, 1 a win and 0.5 a draw.
+
+
+class MCTS:
+    """Monte Carlo tree search with UCT selection and random playouts.
+
+    The playouts complete or block the runs of four, and otherwise pick 
+    random blank cells next to the pieces on a _RolloutBoard. The tree is 
+    kept between searches, so that a later search on the same game starts 
+    from the subtree of the moves played since.
+
+    Attributes:
+        playouts: The number of playouts of the last search.
+
+    Functions:
+        search(board[, time_limit_ms]): Search the position.
+        root_statistics(): The visits and the wins of the root moves.
+    """
+
+    def __init__(
+        self, playouts: int = None, exploration: float = None, seed=None
+    ) -> None:
+        """Initialization to the search.
+
+        Args:
+            playouts (int, optional): 
+                The most playouts of a search. Defaults to AI_MCTS_PLAYOUTS.
+            exploration (float, optional): 
+                The exploration constant of UCT. Defaults to 
+                AI_MCTS_EXPLORATION.
+            seed (optional): The seed of the playouts. Defaults to None.
+        """
+        self._playouts = AI_MCTS_PLAYOUTS if playouts == None else playouts
+        self._exploration = (
+            AI_MCTS_EXPLORATION if exploration == None else exploration
+        )
+        self._random = random.Random(seed)
+        self._root = None
+        self._root_kifu = None
+        self._root_size = None
+        self.playouts = 0
+
+    def search(self, board: Board, time_limit_ms: float = None) -> SearchResult:
+        """Search the position.
+
+        Args:
+            board (Board): The position to search, which is left untouched.
+            time_limit_ms (float, optional): 
+                The time budget in milliseconds. Defaults to no limit, when 
+                the playouts are the only budget.
+
+        Returns:
+            SearchResult: 
+                The most visited move, with its win rate as the score, the 
+                most visited line as the principal variation, and the 
+                playouts (per second) as the nodes (per second).
+        """
+        assert board.winner == None
+        assert len(board.available_place) > 0
+        start = time.perf_counter()
+        deadline = None
+        if time_limit_ms != None:
+            deadline = start + time_limit_ms / 1000
+
+        self._reuse(board)
+        rollout = _RolloutBoard(board)
+        if len(board.kifu) == 0:
+            # Nothing to be next to, the centre is the only move tried.
+            center = (board.board_size[0] // 2, board.board_size[1] // 2)
+            if self._root.untried == None and len(self._root.children) == 0:
+                self._root.untried = [rollout.index(center)]
+
+        self.playouts = 0
+        # At least one playout, which gives the root a child to answer with.
+        while self.playouts < max(self._playouts, 1):
+            if self.playouts > 0 and deadline != None:
+                if time.perf_counter() > deadline:
                     break
-            fg = 0
-            n = min(self._row - x, y)
-            for i in range(1, n):
-                if self._chess_data[x + i][y - i] == index and fg == 0:
-                    count1 += 1
-                    count2 += 1
-                    if (
-                        x + i + 1 < n
-                        and y - i - 1 > -1
-                        and self._chess_data[x + i + 1][y - i - 1] == -index
-                    ):
-                        wall = True
-                elif self._chess_data[x + i][y - i] == 0:
-                    count2 += 1
-                    fg = 1
-                else:
+            rollout.reset()
+            self._playout(rollout)
+            self.playouts += 1
+
+        elapsed = time.perf_counter() - start
+        pv, node = [], self._root
+        while len(node.children) > 0:
+            node = max(node.children, key=lambda child: child.visits)
+            pv.append(rollout.move(node.index))
+        best = max(self._root.children, key=lambda child: child.visits)
+        return SearchResult(
+            pv[0],
+            best.wins / max(best.visits, 1),
+            len(pv),
+            pv,
+            self.playouts,
+            self.playouts / max(elapsed, 1e-9),
+        )
+
+    def root_statistics(self) -> List[Tuple[Tuple[int, int], int, float]]:
+        """The visits and the wins of the root moves of the last search.
+
+        Returns:
+            List[Tuple[Tuple[int, int], int, float]]: 
+                The move, the visits and the wins (for the side to move) of 
+                each child of the root.
+        """
+        stride = self._root_size[1] + 2
+        statistics = []
+        for child in self._root.children:
+            column, row = divmod(child.index, stride)
+            statistics.append(((column - 1, row - 1), child.visits, child.wins))
+        return statistics
+
+    def _reuse(self, board: Board) -> None:
+        """Move the root to the position of the board, reusing the subtree of
+        the moves played since the last search when there is one.
+        """
+        kifu = board.kifu_copy
+        root = self._root
+        if (
+            root != None
+            and self._root_size == board.board_size
+            and kifu[: len(self._root_kifu)] == self._root_kifu
+        ):
+            stride = board.board_size[1] + 2
+            for move in kifu[len(self._root_kifu) :]:
+                index = (move[0] + 1) * stride + move[1] + 1
+                root = next(
+                    (x for x in root.children if x.index == index), None
+                )
+                if root == None:
                     break
-        return count1, count2, wall
+        else:
+            root = None
+        if root == None:
+            root = _Node(-1, 1 - len(kifu) % 2)
+        self._root = root
+        self._root_kifu = kifu
+        self._root_size = board.board_size
 
+    def _playout(self, rollout: _RolloutBoard) -> None:
+        """Select, expand, play out and back up once.
 
-def get_move(board: Board) -> Tuple[int, int]:
-    assert len(board.available_place) > 0
-    board_map = {False: {-1: 0, 0: 1, 1: -1}, True: {-1: 0, 0: -1, 1: 1}}
-    converted_board = [
-        [
-            board_map[board.current_side][board.board[i][j]]
-            for j in range(len(board.board))
-        ]
-        for i in range(len(board.board))
-    ]
-    return BoardAI(converted_board).down_chess(-1)
+        Args:
+            rollout (_RolloutBoard): The board at the root position.
+        """
+        rand = self._random.random
+        node = self._root
+        path = [node]
+        winner = None
+        while True:
+            if node.won:
+                winner = node.side
+                break
+            side = 1 - node.side
+            if node.untried == None:
+                node.untried = rollout.near_moves()
+                self._random.shuffle(node.untried)
+            if len(node.untried) > 0:
+                index = node.untried.pop()
+                child = _Node(index, side, rollout.place(index, side))
+                node.children.append(child)
+                path.append(child)
+                if child.won:
+                    winner = side
+                    break
+                # Play out from the new node.
+                side = 1 - side
+                while True:
+                    index = rollout.rollout_move(side, rand)
+                    if index < 0:
+                        break
+                    if rollout.place(index, side):
+                        winner = side
+                        break
+                    side = 1 - side
+                break
+            if len(node.children) == 0:
+                break  # The board is full, a draw.
+            node = self._select(node)
+            path.append(node)
+            rollout.place(node.index, node.side)
+
+        for node in path:
+            node.visits += 1
+            if winner == None:
+                node.wins += 0.5
+            elif winner == node.side:
+                node.wins += 1
 
+    def _select(self, node: _Node) -> _Node:
+        """The child with the highest upper confidence bound."""
+        factor = self._exploration * math.sqrt(math.log(node.visits))
+        best, best_bound = None, -math.inf
+        for child in node.children:
+            visits = child.visits
+            bound = child.wins / visits + factor / math.sqrt(visits)
+            if bound > best_bound:
+                best, best_bound = child, bound
+        return best
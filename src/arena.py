@@ -0,0 +1,274 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: src/arena.py
+Description: 
+    The headless arena, which plays games between the players without the
+    interface, over a pool of worker processes, to measure the strength and
+    the speed of the robots.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Tuple, Type
+import argparse
+import os
+import time
+
+import src.constants
+import src.parallel
+from src.core import Board
+from src.database import BoardDatabase
+from src.players import (
+    GreedyRobotPlayer,
+    MCTSPlayer,
+    MonkeyPlayer,
+    Player,
+    RobotPlayer,
+)
+
+# The players known by name on the command line.
+PLAYERS: Dict[str, Type[Player]] = {
+    "monkey": MonkeyPlayer,
+    "greedy": GreedyRobotPlayer,
+    "robot": RobotPlayer,
+    "mcts": MCTSPlayer,
+}
+
+
+class GameRecord(NamedTuple):
+    """A game played in the arena.
+
+    Attributes:
+        black: The name of the black player.
+        white: The name of the white player.
+        board_size: The size of the board.
+        kifu: The moves of the game.
+        winner: 0 for black, 1 for white, None for a draw.
+        times: The seconds each move took, in the order of the kifu.
+    """
+
+    black: str
+    white: str
+    board_size: Tuple[int, int]
+    kifu: List[Tuple[int, int]]
+    winner: int
+    times: List[float]
+
+    def to_board(self) -> Board:
+        """Replay the game on a new board, to be saved to the database."""
+        board = Board(self.board_size, self.black, self.white)
+        for move in self.kifu:
+            board.place(*move)
+        return board
+
+
+class ArenaResult(NamedTuple):
+    """The results of the games between two players.
+
+    Attributes:
+        games: The records of the games, in the order they were played.
+        wins: The games won by the first and by the second player.
+        draws: The drawn games.
+        move_times: The mean seconds a move of each player took.
+        games_per_second: The throughput of the arena.
+    """
+
+    games: List[GameRecord]
+    wins: Tuple[int, int]
+    draws: int
+    move_times: Tuple[float, float]
+    games_per_second: float
+
+
+def play_game(
+    black: Type[Player],
+    white: Type[Player],
+    board_size: Tuple[int, int] = None,
+    names: Tuple[str, str] = None,
+) -> GameRecord:
+    """Play one game to the end.
+
+    Args:
+        black (Type[Player]): The class of the black player.
+        white (Type[Player]): The class of the white player.
+        board_size (Tuple[int, int], optional): 
+            The size of the board. Defaults to DEFAULT_BOARD_SIZE.
+        names (Tuple[str, str], optional): 
+            The names of the players. Defaults to the class names.
+
+    Returns:
+        GameRecord: The game.
+    """
+    if names == None:
+        names = (black.__name__, white.__name__)
+    board = Board(board_size, *names)
+    players = (black(board), white(board))
+    times = []
+    while board.winner == None and len(board.available_place) > 0:
+        start = time.perf_counter()
+        move = players[int(board.current_side)].get_move()
+        times.append(time.perf_counter() - start)
+        board.place(*move)
+    return GameRecord(
+        names[0],
+        names[1],
+        board.board_size,
+        board.kifu_copy,
+        None if board.winner == None else int(board.winner),
+        times,
+    )
+
+
+def _init_worker() -> None:
+    # The arena is parallel over the games, so the search of a robot stays in
+    # its worker instead of starting a pool of its own.
+    src.parallel.AI_WORKERS = 1
+
+
+def run_arena(
+    player_a: str,
+    player_b: str,
+    games: int,
+    workers: int = None,
+    board_size: Tuple[int, int] = None,
+    database: BoardDatabase = None,
+    verbose: bool = False,
+) -> ArenaResult:
+    """Play the games between two players, who take black in turn.
+
+    Args:
+        player_a (str): The name of the first player, see PLAYERS.
+        player_b (str): The name of the second player, see PLAYERS.
+        games (int): The number of the games.
+        workers (int, optional): 
+            The worker processes. Defaults to the number of the cores.
+        board_size (Tuple[int, int], optional): 
+            The size of the board. Defaults to DEFAULT_BOARD_SIZE.
+        database (BoardDatabase, optional): 
+            Where to save the games, a batch at a time in the order of 
+            their numbers. Defaults to None.
+        verbose (bool, optional): 
+            Whether to print every game as it ends. Defaults to False.
+
+    Returns:
+        ArenaResult: The games and the statistics.
+    """
+    if workers == None:
+        workers = os.cpu_count() or 1
+    stamp = time.strftime(src.constants.TIME_FORMAT, time.localtime())
+    records = [None] * games
+    writer = None if database == None else database.batch()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        tasks = {}
+        for i in range(games):
+            names = (player_a, player_b) if i % 2 == 0 else (player_b, player_a)
+            classes = (PLAYERS[names[0]], PLAYERS[names[1]])
+            task = pool.submit(play_game, *classes, board_size, names)
+            tasks[task] = i
+        saved = 0  # The games before it are saved.
+        for task in as_completed(tasks):
+            i = tasks[task]
+            record = records[i] = task.result()
+            # The games are rated in the order of their timestamps as they 
+            # are saved, so they are saved in the order of their numbers 
+            # rather than as they end.
+            while writer != None and saved < games and records[saved] != None:
+                board = records[saved].to_board()
+                # The games of a run start within the same second, and are
+                # padded to sort by their number.
+                board.timestamp = "%s #%09d" % (stamp, saved + 1)
+                writer.append(board)
+                saved += 1
+            if verbose:
+                winner = (
+                    "draw" if record.winner == None else record[record.winner]
+                )
+                print(
+                    "Game %d: %s vs %s, %d moves, %s"
+                    % (
+                        i + 1,
+                        record.black,
+                        record.white,
+                        len(record.kifu),
+                        winner,
+                    )
+                )
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    if writer != None:
+        writer.flush()
+
+    wins, draws = [0, 0], 0
+    times = ([], [])
+    for record in records:
+        if record.winner == None:
+            draws += 1
+        else:
+            wins[int(record[record.winner] != player_a)] += 1
+        for ply, seconds in enumerate(record.times):
+            times[int(record[ply % 2] != player_a)].append(seconds)
+    move_times = tuple(sum(x) / max(len(x), 1) for x in times)
+    return ArenaResult(records, tuple(wins), draws, move_times, games / elapsed)
+
+
+def main(argv: List[str] = None) -> None:
+    """The command line of the arena, see `python arena.py --help`."""
+    parser = argparse.ArgumentParser(
+        description="Play games between two players without the interface."
+    )
+    parser.add_argument("player_a", choices=PLAYERS)
+    parser.add_argument("player_b", choices=PLAYERS)
+    parser.add_argument("-n", "--games", type=int, default=10)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument(
+        "-s", "--size", type=int, nargs=2, default=None, metavar=("W", "H")
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="save the games to the database"
+    )
+    args = parser.parse_args(argv)
+
+    database = None
+    if args.save:
+        database = BoardDatabase()
+    result = run_arena(
+        args.player_a,
+        args.player_b,
+        args.games,
+        args.workers,
+        None if args.size == None else tuple(args.size),
+        database,
+        verbose=True,
+    )
+    print(
+        "%s %d - %d %s, %d draws"
+        % (
+            args.player_a,
+            result.wins[0],
+            result.wins[1],
+            args.player_b,
+            result.draws,
+        )
+    )
+    print(
+        "%.3f games/s, %.1f ms/move for %s, %.1f ms/move for %s"
+        % (
+            result.games_per_second,
+            result.move_times[0] * 1000,
+            args.player_a,
+            result.move_times[1] * 1000,
+            args.player_b,
+        )
+    )
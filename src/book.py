@@ -0,0 +1,239 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: src/book.py
+Description: 
+    The opening book, which is built from the saved games and answers the 
+    known openings without a search.
+"""
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+import bisect
+import os
+import random
+import numpy as np
+
+from src.constants import (
+    AI_BOOK_MIN_GAMES,
+    AI_BOOK_PATH,
+    AI_BOOK_PLIES,
+    res_path,
+)
+from src.core import Board, transform
+
+# One record a move played in a position. The position is its key, see 
+# _position_key, and the move is mapped by its canonical symmetry, so that the
+# symmetric positions share their records. Wins and losses are of the side to
+# move.
+BOOK_DTYPE = np.dtype(
+    [
+        ("hash", "<u8"),
+        ("column", "u1"),
+        ("row", "u1"),
+        ("games", "<u4"),
+        ("wins", "<u4"),
+        ("losses", "<u4"),
+    ]
+)
+
+_book = None
+
+
+@lru_cache(maxsize=None)
+def _size_key(board_size: Tuple[int, int]) -> int:
+    """The random 64-bit key of the board size, the same across runs."""
+    return random.Random("pyGobang book %dx%d" % board_size).getrandbits(64)
+
+
+def _position_key(board: Board) -> int:
+    """The key of the position in the book.
+
+    The canonical hash mixed with the board size, as the empty boards of all
+    the sizes hash to 0 and the records of a size must not answer another.
+    """
+    return board.canonical_hash ^ _size_key(tuple(board.board_size))
+
+
+def _untransform(
+    position: Tuple[int, int], board_size: Tuple[int, int], symmetry: int
+) -> Tuple[int, int]:
+    """Map the position back, the inverse of `transform`."""
+    column, row = position
+    if symmetry & 4:
+        column, row = row, column
+    if symmetry & 1:
+        column = board_size[0] - 1 - column
+    if symmetry & 2:
+        row = board_size[1] - 1 - row
+    return column, row
+
+
+def build_book(
+    boards: Iterable[Board], path: str = None, max_plies: int = None
+) -> int:
+    """Build the opening book from the games and write it to the file.
+
+    Only the finished games count, that is the ones with a winner or a full
+    board. The book opened by get_book is dropped, so that the next call 
+    opens the new one.
+
+    Args:
+        boards (Iterable[Board]): 
+            The games, such as BoardDatabase.iter_boards().
+        path (str, optional): 
+            The file of the book, which is replaced. Defaults to AI_BOOK_PATH
+            in the resources.
+        max_plies (int, optional): 
+            The moves of each game taken in. Defaults to AI_BOOK_PLIES.
+
+    Returns:
+        int: The number of the records.
+    """
+    global _book
+    if path == None:
+        path = res_path(AI_BOOK_PATH)
+    if max_plies == None:
+        max_plies = AI_BOOK_PLIES
+    counts = {}  # (hash, column, row) -> [games, wins, losses]
+    for game in boards:
+        if game.winner == None and len(game.available_place) > 0:
+            continue
+        size = game.board_size
+        board = Board(size)
+        for ply, move in enumerate(game.kifu[:max_plies]):
+            symmetry = board.canonical_symmetry
+            key = (_position_key(board),) + transform(move, size, symmetry)
+            count = counts.setdefault(key, [0, 0, 0])
+            count[0] += 1
+            if game.winner != None:
+                count[1 if game.winner == ply % 2 else 2] += 1
+            board.place(*move)
+
+    book = np.zeros(len(counts), dtype=BOOK_DTYPE)
+    for i, (key, count) in enumerate(sorted(counts.items())):
+        book[i] = key + tuple(count)
+    # Written aside and moved in place, as the old file may still be mapped.
+    with open(path + ".tmp", "wb") as file:
+        np.save(file, book)
+    os.replace(path + ".tmp", path)
+    _book = None
+    return len(book)
+
+
+class OpeningBook:
+    """The opening book, a table of records sorted by the position hash.
+
+    The file is memory-mapped, so that the book is not read in full, and the
+    records of a position are found by a binary search, which reads a few 
+    of them only.
+
+    Functions:
+        moves(board): The book moves of the position.
+        best_move(board): The best book move, if any is good enough.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        """Open the book.
+
+        Args:
+            path (str, optional): 
+                The file of the book, see build_book. The book is empty if 
+                the file does not exist. Defaults to AI_BOOK_PATH in the 
+                resources.
+        """
+        if path == None:
+            path = res_path(AI_BOOK_PATH)
+        if os.path.exists(path):
+            self._book = np.load(path, mmap_mode="r")
+        else:
+            self._book = np.zeros(0, dtype=BOOK_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self._book)
+
+    def moves(
+        self, board: Board
+    ) -> List[Tuple[Tuple[int, int], int, int, int]]:
+        """The book moves of the position.
+
+        Args:
+            board (Board): The position.
+
+        Returns:
+            List[Tuple[Tuple[int, int], int, int, int]]: 
+                The moves with the games, wins and losses of the side to move
+                after them.
+        """
+        if len(self._book) == 0:
+            return []
+        key = np.uint64(_position_key(board))
+        # A strided view, which np.searchsorted would copy in full first.
+        hashes = self._book["hash"]
+        start = bisect.bisect_left(hashes, key)
+        end = bisect.bisect_right(hashes, key, start)
+        symmetry = board.canonical_symmetry
+        moves = []
+        for record in self._book[start:end]:
+            move = _untransform(
+                (int(record["column"]), int(record["row"])),
+                board.board_size,
+                symmetry,
+            )
+            if move in board.available_place:
+                moves.append(
+                    (
+                        move,
+                        int(record["games"]),
+                        int(record["wins"]),
+                        int(record["losses"]),
+                    )
+                )
+        return moves
+
+    def best_move(
+        self, board: Board, min_games: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """The best book move, scored by its wins, with a draw as half a win.
+
+        Args:
+            board (Board): The position.
+            min_games (int, optional): 
+                The fewest games of a move to be trusted. Defaults to 
+                AI_BOOK_MIN_GAMES.
+
+        Returns:
+            NoneType or Tuple[int, int]: 
+                The move, or None if no move is played often enough or wins 
+                at least as often as it loses.
+        """
+        if min_games == None:
+            min_games = AI_BOOK_MIN_GAMES
+        best, best_score = None, 0.5
+        for move, games, wins, losses in self.moves(board):
+            if games < min_games:
+                continue
+            score = (games + wins - losses) / (2 * games)
+            if score >= best_score:
+                best, best_score = move, score
+        return best
+
+
+def get_book() -> OpeningBook:
+    """The opening book at AI_BOOK_PATH, opened on the first call."""
+    global _book
+    if _book == None:
+        _book = OpeningBook()
+    return _book
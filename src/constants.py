@@ -28,6 +28,29 @@ MAINSCREEN_BOARD_SIZE = (13, 13)  # (WIDTH,LENGTH)
 
 TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+AI_TIME_LIMIT = 1000  # Time budget of the robot for each move, in ms.
+AI_HARD_TIME_LIMIT = 2000  # Hard deadline of the robot for each move, in ms.
+AI_PONDER_REPLIES = 3  # Likely replies searched on the opponent's time.
+AI_MAX_DEPTH = 8  # Deepest iteration of the alpha-beta search.
+AI_SEARCH_BRANCH = 8  # Moves tried in each node of the alpha-beta search.
+AI_TABLE_SIZE = 16  # Memory cap of the transposition table, in MB.
+AI_THREAT_NODES = 1000  # Node budget of the threat solver.
+AI_VCF_DEPTH = 12  # Most attacking moves in a continuous four.
+AI_VCT_DEPTH = 4  # Most attacking moves in a continuous three.
+AI_MCTS_PLAYOUTS = 100000  # Most playouts of the Monte Carlo tree search.
+AI_MCTS_EXPLORATION = 1.4  # Exploration constant of the UCT selection.
+AI_WORKERS = None  # Processes of the parallel search, None for all the cores.
+AI_STOP_POLL = 0.01  # Seconds between the workers' checks of the stop flag.
+AI_BOOK_PATH = "book.npy"  # Opening book of the saved games, in the res dir.
+AI_BOOK_PLIES = 12  # Moves of each game taken into the opening book.
+AI_BOOK_MIN_GAMES = 2  # Fewest games of a move to be played from the book.
+
+RATING_INITIAL = 1500  # Rating of a new player, by both systems.
+RATING_ELO_K = 32  # K-factor of the Elo system.
+RATING_INITIAL_RD = 350  # Rating deviation of a new player in Glicko-2.
+RATING_INITIAL_VOLATILITY = 0.06  # Volatility of a new player in Glicko-2.
+RATING_TAU = 0.5  # Constraint on the change of the volatility in Glicko-2.
+
 MUTE_SOUND = False
 SOUND_VOLUME = 1.0
 
@@ -50,6 +73,7 @@ GAME_BACKGROUND = None
 TEXTURE_BLOCK_SIZE = 256
 SELECT_ATTEMPT = 128
 OVERLAY_SCALE = 8
+TABLE_PAGE_SIZE = 64  # Rows of a paged table fetched at a time.
 
 import os
 
@@ -71,6 +95,22 @@ TIMER_TICK = pygame.event.custom_type()
 LAST_BOARD = None
 
 DEFAULT_DATABASE_PATH = "data.db"
+DATABASE_BATCH_SIZE = 1000  # Games written by one executemany.
+DATABASE_TIMEOUT = 5.0  # Seconds to wait for a lock held by another process.
+# Set on every connection. With the write-ahead log the readers do not block
+# the writer and the other way round, and a commit need not sync the disk.
+DATABASE_PRAGMAS = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA cache_size = -16384;
+PRAGMA mmap_size = 268435456;
+"""
+DATABASE_GET_VERSION = """
+PRAGMA user_version
+"""
+DATABASE_SET_VERSION = """
+PRAGMA user_version = {}
+"""
 DATABASE_CREATE_TABLE = """
 CREATE TABLE IF NOT EXISTS board_table(
    timestamp_ TEXT  PRIMARY KEY,
@@ -78,25 +118,228 @@ CREATE TABLE IF NOT EXISTS board_table(
    competitor_white TEXT,
    board_size BLOB NOT NULL,
    kifu BLOB NOT NULL,
-   winner INTEGER
+   winner INTEGER,
+   board_width INTEGER,
+   board_height INTEGER
 ) WITHOUT ROWID;
 """
+DATABASE_TABLE_INFO = """
+PRAGMA table_info(board_table)
+"""
+DATABASE_ADD_BOARD_SIZE_COLUMNS = """
+ALTER TABLE board_table ADD COLUMN board_width INTEGER;
+ALTER TABLE board_table ADD COLUMN board_height INTEGER;
+"""
+DATABASE_SELECT_BOARD_SIZES = """
+SELECT timestamp_,board_size from board_table
+"""
+DATABASE_UPDATE_BOARD_SIZE = """
+UPDATE board_table SET board_width=?, board_height=? where timestamp_=?
+"""
+DATABASE_SELECT_KIFU = """
+SELECT timestamp_,board_size,kifu from board_table
+"""
+DATABASE_UPDATE_KIFU = """
+UPDATE board_table SET board_size=?, kifu=? where timestamp_=?
+"""
+DATABASE_CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS board_black_index
+    ON board_table(competitor_black, timestamp_);
+CREATE INDEX IF NOT EXISTS board_white_index
+    ON board_table(competitor_white, timestamp_);
+CREATE INDEX IF NOT EXISTS board_winner_index
+    ON board_table(winner, timestamp_);
+CREATE INDEX IF NOT EXISTS board_size_index
+    ON board_table(board_width, board_height, timestamp_);
+"""
 DATABASE_INSERT_BOARD = """
 INSERT INTO board_table 
 (
     timestamp_,competitor_black,
     competitor_white,board_size,
-    kifu,winner
-) VALUES (?, ?, ?, ?, ?, ?)
+    kifu,winner,
+    board_width,board_height
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
 """
 DATABASE_SELECT_BOARD = """
 SELECT timestamp_,competitor_black,
        competitor_white,board_size,
        kifu,winner from board_table
 """
+DATABASE_SELECT_BOARD_BY_TIMESTAMP = """
+SELECT timestamp_,competitor_black,
+       competitor_white,board_size,
+       kifu,winner from board_table where timestamp_=?
+"""
+# The summaries and the count of the games, where {} is the WHERE clause of
+# the filters, if any.
+DATABASE_SELECT_SUMMARY = """
+SELECT timestamp_,competitor_black,
+       competitor_white,winner,
+       board_width,board_height from board_table {}
+ORDER BY timestamp_ LIMIT ? OFFSET ?
+"""
+DATABASE_COUNT_BOARD = """
+SELECT COUNT(*) from board_table {}
+"""
 DATABASE_DELETE_BOARD = """
 DELETE from board_table where timestamp_=?
 """
+DATABASE_HAS_BOARD = """
+SELECT 1 from board_table where timestamp_=?
+"""
+DATABASE_CREATE_RATING_TABLE = """
+CREATE TABLE IF NOT EXISTS rating_table(
+   player TEXT  PRIMARY KEY,
+   elo REAL NOT NULL,
+   glicko REAL NOT NULL,
+   rd REAL NOT NULL,
+   volatility REAL NOT NULL,
+   games INTEGER NOT NULL,
+   score INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+DATABASE_SELECT_RATING = """
+SELECT elo,glicko,rd,volatility,games,score from rating_table where player=?
+"""
+DATABASE_SELECT_RATINGS = """
+SELECT player,elo,glicko,rd,volatility,games,score from rating_table
+ORDER BY elo DESC
+"""
+DATABASE_REPLACE_RATING = """
+INSERT OR REPLACE INTO rating_table
+(
+    player,elo,glicko,rd,
+    volatility,games,score
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+DATABASE_DELETE_RATINGS = """
+DELETE from rating_table
+"""
+DATABASE_DELETE_RATING = """
+DELETE from rating_table where player=?
+"""
+# The ratings of the two players before every rated game, so that the games
+# from a timestamp on can be rated again without replaying the earlier ones.
+DATABASE_CREATE_RATING_HISTORY_TABLE = """
+CREATE TABLE IF NOT EXISTS rating_history(
+   timestamp_ TEXT NOT NULL,
+   player TEXT NOT NULL,
+   elo REAL NOT NULL,
+   glicko REAL NOT NULL,
+   rd REAL NOT NULL,
+   volatility REAL NOT NULL,
+   games INTEGER NOT NULL,
+   score INTEGER NOT NULL,
+   PRIMARY KEY(timestamp_, player)
+) WITHOUT ROWID;
+"""
+DATABASE_INSERT_RATING_HISTORY = """
+INSERT OR REPLACE INTO rating_history
+(
+    timestamp_,player,elo,glicko,
+    rd,volatility,games,score
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# The rating of every player before its first game from the timestamp on,
+# the bare columns are those of the row of the MIN().
+DATABASE_SELECT_RATINGS_BEFORE = """
+SELECT player,MIN(timestamp_),elo,glicko,
+       rd,volatility,games,score from rating_history
+where timestamp_>=? GROUP BY player
+"""
+DATABASE_SELECT_LAST_RATED = """
+SELECT MAX(timestamp_) from rating_history
+"""
+DATABASE_DELETE_RATING_HISTORY = """
+DELETE from rating_history where timestamp_>=?
+"""
+DATABASE_SELECT_RESULTS_SINCE = """
+SELECT timestamp_,competitor_black,competitor_white,
+       kifu,winner from board_table where timestamp_>=?
+ORDER BY timestamp_
+"""
+DATABASE_SELECT_RESULT = """
+SELECT competitor_black,competitor_white,
+       kifu,winner from board_table where timestamp_=?
+"""
+DATABASE_CREATE_PLAYER_STATS_TABLE = """
+CREATE TABLE IF NOT EXISTS player_stats(
+   player TEXT  PRIMARY KEY,
+   games INTEGER NOT NULL,
+   wins INTEGER NOT NULL,
+   losses INTEGER NOT NULL,
+   draws INTEGER NOT NULL,
+   moves INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rating_elo_index ON rating_table(elo);
+"""
+DATABASE_ADD_PLAYER_STATS = """
+INSERT INTO player_stats
+(
+    player,games,wins,
+    losses,draws,moves
+) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(player) DO UPDATE SET
+    games=games+excluded.games,
+    wins=wins+excluded.wins,
+    losses=losses+excluded.losses,
+    draws=draws+excluded.draws,
+    moves=moves+excluded.moves
+"""
+DATABASE_DELETE_EMPTY_PLAYER_STATS = """
+DELETE from player_stats where games<=0
+"""
+DATABASE_DELETE_PLAYER_STATS = """
+DELETE from player_stats
+"""
+DATABASE_SELECT_PLAYER_STATS = """
+SELECT s.player,s.games,s.wins,s.losses,s.draws,
+       CAST(s.moves AS REAL) / s.games,r.elo
+from rating_table r JOIN player_stats s USING(player)
+ORDER BY r.elo DESC
+"""
+DATABASE_SELECT_RESULTS = """
+SELECT competitor_black,competitor_white,
+       kifu,winner from board_table ORDER BY timestamp_
+"""
+# The position index, the canonical hash (see Board.canonical_hash, as a
+# signed integer) of the position after every ply of every game. A game never
+# reaches a position twice, as the pieces are only added.
+DATABASE_POSITION_INDEX = True  # Whether to keep the position index.
+DATABASE_HAS_POSITION_TABLE = """
+SELECT 1 from sqlite_master where type='table' AND name='position_table'
+"""
+DATABASE_CREATE_POSITION_TABLE = """
+CREATE TABLE IF NOT EXISTS position_table(
+   hash INTEGER NOT NULL,
+   timestamp_ TEXT NOT NULL,
+   ply INTEGER NOT NULL,
+   PRIMARY KEY(hash, timestamp_)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS position_game_index
+    ON position_table(timestamp_);
+"""
+DATABASE_DROP_POSITION_TABLE = """
+DROP TABLE IF EXISTS position_table
+"""
+DATABASE_INSERT_POSITION = """
+INSERT INTO position_table (hash,timestamp_,ply) VALUES (?, ?, ?)
+"""
+DATABASE_DELETE_POSITIONS = """
+DELETE from position_table where timestamp_=?
+"""
+DATABASE_DELETE_ALL_POSITIONS = """
+DELETE from position_table
+"""
+DATABASE_SELECT_GAMES_BY_POSITION = """
+SELECT b.timestamp_,b.competitor_black,
+       b.competitor_white,b.winner,
+       b.board_width,b.board_height,p.ply
+from position_table p JOIN board_table b USING(timestamp_)
+where p.hash=? AND b.board_width=? AND b.board_height=?
+ORDER BY p.timestamp_ LIMIT ?
+"""
 
 from src.database import BoardDatabase
 
@@ -19,12 +19,147 @@ Description:
     The core code section, which contains the definition of the board and the 
     determination of winning and losing positions.
 """
+from array import array
+from collections.abc import Sequence, Set as AbstractSet
+from functools import lru_cache
 from typing import List, Set, Tuple
 import numpy as np
+import random
 import time
 
 import src.constants
 from src.constants import TIME_FORMAT
+from src.pattern import EDGE, FIVES, OFFSETS
+
+# The four line directions (column step, row step), which are also the order of
+# the `direction` argument of the line queries.
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# The candidates are the blank spaces within this many lines of any piece.
+CANDIDATE_DISTANCE = 2
+
+
+def symmetries(board_size: Tuple[int, int]) -> int:
+    """The number of symmetries of the board.
+
+    Args:
+        board_size (Tuple[int, int]): The size of the board.
+
+    Returns:
+        int: 8 for a square board, otherwise 4 (no symmetry swaps the axes).
+    """
+    return 8 if board_size[0] == board_size[1] else 4
+
+
+def transform(
+    position: Tuple[int, int], board_size: Tuple[int, int], symmetry: int
+) -> Tuple[int, int]:
+    """Map the position by one of the symmetries of the board.
+
+    Args:
+        position (Tuple[int, int]): The (column, row) of the position.
+        board_size (Tuple[int, int]): The size of the board.
+        symmetry (int): 
+            The index of the symmetry, from 0 (identity) to 
+            symmetries(board_size) - 1. The symmetries 0-3 mirror the columns 
+            and/or the rows, 4-7 also swap the axes of a square board.
+
+    Returns:
+        Tuple[int, int]: The mapped position.
+    """
+    column, row = position
+    if symmetry & 1:
+        column = board_size[0] - 1 - column
+    if symmetry & 2:
+        row = board_size[1] - 1 - row
+    if symmetry & 4:
+        column, row = row, column
+    return column, row
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(board_size: Tuple[int, int]) -> List[List[List[List[int]]]]:
+    """The Zobrist keys of the board, shared by all the boards of the size.
+
+    The keys are drawn from a generator seeded by the board size, so that the
+    hash of a position is the same across runs and processes.
+
+    Args:
+        board_size (Tuple[int, int]): The size of the board.
+
+    Returns:
+        List[List[List[List[int]]]]: 
+            The 64-bit key keys[symmetry][side][column][row] of a piece, which
+            is the key of the piece mapped by the symmetry.
+    """
+    width, height = board_size
+    rng = random.Random("pyGobang zobrist %dx%d" % (width, height))
+    keys = [
+        [
+            [rng.getrandbits(64) for row in range(height)]
+            for column in range(width)
+        ]
+        for side in range(2)
+    ]
+    table = []
+    for symmetry in range(symmetries(board_size)):
+        mapped = [
+            [
+                transform((column, row), board_size, symmetry)
+                for row in range(height)
+            ]
+            for column in range(width)
+        ]
+        table.append(
+            [
+                [[keys[side][c][r] for c, r in column] for column in mapped]
+                for side in range(2)
+            ]
+        )
+    return table
+
+
+class KifuView(Sequence):
+    """Read-only sequence proxy to a kifu, which never copies the moves."""
+
+    __slots__ = ("_kifu",)
+
+    def __init__(self, kifu: List[Tuple[int, int]]) -> None:
+        self._kifu = kifu
+
+    def __getitem__(self, index):
+        return self._kifu[index]
+
+    def __len__(self) -> int:
+        return len(self._kifu)
+
+    def __repr__(self) -> str:
+        return "KifuView(%r)" % (self._kifu,)
+
+
+class PlaceView(AbstractSet):
+    """Read-only set proxy to a set of places, which never copies the set."""
+
+    __slots__ = ("_places",)
+
+    def __init__(self, places: Set[Tuple[int, int]]) -> None:
+        self._places = places
+
+    @classmethod
+    def _from_iterable(cls, iterable) -> Set[Tuple[int, int]]:
+        return set(iterable)
+
+    def __contains__(self, place) -> bool:
+        return place in self._places
+
+    def __iter__(self):
+        return iter(self._places)
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def __repr__(self) -> str:
+        return "PlaceView(%r)" % (self._places,)
 
 
 class Board:
@@ -36,17 +171,30 @@ class Board:
         current_side: The current side of the player.
         winner: The final winner.
         winpath: The critical pieces for the winner.
-        board: The board of the game.
-        kifu: The kifu of the game.
-        available_place: The set of available place in board.
+        board: The read-only view to the board of the game.
+        board_copy: A writable copy of the board of the game.
+        kifu: The read-only view to the kifu of the game.
+        kifu_copy: A copy of the kifu of the game.
+        available_place: The read-only view to the available places.
+        available_place_copy: A copy of the set of available places.
+        candidates: The read-only view to the places near the pieces.
         competitor_black: The name of the black competitor.
         competitor_white: The name of the white competitor.
+        zobrist_hash: The Zobrist hash of the position.
+        canonical_hash: The symmetry-canonical hash of the position.
+        canonical_symmetry: The symmetry mapping to the canonical image.
     
     Functions:
         place(column, row): 
             Attempt to place one piece to the given position.
         cancel():
             Try to cancel the previous place.
+        line_span(column, row, direction, side):
+            The pieces of one side right before and after the position.
+        line_run(column, row, direction[, side]):
+            The run length and open ends through the position.
+        line_code(column, row, direction):
+            The pattern code of the neighbours of the position.
     """
 
     def __init__(
@@ -83,6 +231,57 @@ class Board:
                 self._available_place.add((i, j))
         self._kifu = list()
 
+        # Incremental line runs, self._runs[side][direction][end][column][row]
+        # is the number of consecutive `side` pieces right before (end 0) or
+        # after (end 1) the position, where side -1 counts the blank spaces.
+        # Nested lists rather than an ndarray, as they are read one by one.
+        runs = np.zeros((3, 4, 2, *self._BOARD_SIZE), dtype=int)
+        columns, rows = np.indices(self._BOARD_SIZE)
+        unbounded = np.full(self._BOARD_SIZE, max(self._BOARD_SIZE))
+        for d, (dc, dr) in enumerate(DIRECTIONS):
+            for end, sign in ((0, -1), (1, 1)):
+                steps = unbounded
+                for step, index, size in (
+                    (sign * dc, columns, self._BOARD_SIZE[0]),
+                    (sign * dr, rows, self._BOARD_SIZE[1]),
+                ):
+                    if step > 0:
+                        steps = np.minimum(steps, size - 1 - index)
+                    elif step < 0:
+                        steps = np.minimum(steps, index)
+                runs[-1, d, end] = steps
+        self._runs = runs.tolist()
+
+        # Incremental pattern codes (see src.pattern), self._codes[direction]
+        # [column][row] starts with the cells outside the board.
+        codes = np.zeros((4, *self._BOARD_SIZE), dtype=int)
+        for d, (dc, dr) in enumerate(DIRECTIONS):
+            for step, weight in OFFSETS:
+                c, r = columns + step * dc, rows + step * dr
+                outside = (c < 0) | (c >= self._BOARD_SIZE[0])
+                outside |= (r < 0) | (r >= self._BOARD_SIZE[1])
+                codes[d] += outside * (EDGE * weight)
+        self._codes = codes.tolist()
+
+        # Zobrist hash of the position mapped by each symmetry of the board.
+        self._zobrist = zobrist_keys(tuple(self._BOARD_SIZE))
+        self._hashes = [0] * len(self._zobrist)
+
+        # Candidates, self._neighbours[column][row] is the number of pieces
+        # within CANDIDATE_DISTANCE lines of the position, and the blank
+        # positions with any of them are in self._candidates.
+        self._neighbours = [
+            [0] * self._BOARD_SIZE[1] for _ in range(self._BOARD_SIZE[0])
+        ]
+        self._candidates = set()
+
+        # Views share the storage above, so they follow every place/cancel.
+        self._board_view = self._board.view()
+        self._board_view.flags.writeable = False
+        self._kifu_view = KifuView(self._kifu)
+        self._available_place_view = PlaceView(self._available_place)
+        self._candidates_view = PlaceView(self._candidates)
+
     @property
     def board_size(self) -> Tuple[int, int]:
         """Size to the board
@@ -131,38 +330,113 @@ class Board:
 
         Returns:
             ndarray: 
-                Array to the board of the game, access by the board[column,row].
+                Read-only view to the board of the game, access by the 
+                board[column,row].
                 Possible values:
                     0  : the black piece.
                     1  : the white piece.
                     -1 : the blank space.
                 Note that the column and row START FROM ZERO (Compared to the 
-                reality)!
+                reality)! The view follows the later places, use `board_copy`
+                to keep a snapshot.
+        """
+        return self._board_view
+
+    @property
+    def board_copy(self):
+        """A writable copy of the board of the game, see `board`.
+
+        Returns:
+            ndarray: Copy to the board of the game.
         """
         return self._board.copy()
 
     @property
-    def kifu(self) -> List[Tuple[int, int]]:
+    def kifu(self) -> Sequence:
         """The kifu of the game
 
         Returns:
-            List[Tuple[int, int]]: 
-                List to the kifu of the game, each tuple indicate the (column, 
-                row) of one piece, taken in the order black-white-black.Note 
-                that the column and row START FROM ZERO (Compared to the 
-                reality)!
+            Sequence[Tuple[int, int]]: 
+                Read-only view to the kifu of the game, each tuple indicate the
+                (column, row) of one piece, taken in the order 
+                black-white-black.Note that the column and row START FROM ZERO 
+                (Compared to the reality)!
+        """
+        return self._kifu_view
+
+    @property
+    def kifu_copy(self) -> List[Tuple[int, int]]:
+        """A copy of the kifu of the game, see `kifu`.
+
+        Returns:
+            List[Tuple[int, int]]: Copy to the kifu of the game.
         """
         return self._kifu.copy()
 
     @property
-    def available_place(self) -> Set[Tuple[int, int]]:
+    def available_place(self) -> AbstractSet:
         """The set of available place in board.
 
+        Returns:
+            Set[Tuple[int,int]]: 
+                Read-only view to the set of available place in board.
+        """
+        return self._available_place_view
+
+    @property
+    def available_place_copy(self) -> Set[Tuple[int, int]]:
+        """A copy of the set of available place in board.
+
         Returns:
             Set[Tuple[int,int]]: The set of available place in board.
         """
         return self._available_place.copy()
 
+    @property
+    def candidates(self) -> AbstractSet:
+        """The available places near the pieces.
+
+        Returns:
+            Set[Tuple[int,int]]: 
+                Read-only view to the set of available places within 
+                CANDIDATE_DISTANCE lines (in any direction) of any piece, 
+                which is empty before the first place.
+        """
+        return self._candidates_view
+
+    @property
+    def zobrist_hash(self) -> int:
+        """The Zobrist hash of the position.
+
+        Returns:
+            int: 
+                The 64-bit hash, updated incrementally by place and cancel. 
+                Equal positions of the same board size share the same hash.
+        """
+        return self._hashes[0]
+
+    @property
+    def canonical_hash(self) -> int:
+        """The symmetry-canonical hash of the position.
+
+        Returns:
+            int: 
+                The smallest Zobrist hash among the symmetric images of the 
+                position, which is shared by all the symmetric positions.
+        """
+        return min(self._hashes)
+
+    @property
+    def canonical_symmetry(self) -> int:
+        """The symmetry mapping the position to its canonical image.
+
+        Returns:
+            int: 
+                The symmetry (see `transform`), under which the image of the 
+                position has the hash `canonical_hash`.
+        """
+        return self._hashes.index(min(self._hashes))
+
     def place(self, column, row) -> None:
         """Attempt to place one piece to the given position.
 
@@ -175,35 +449,24 @@ class Board:
         self._available_place.remove((column, row))
         self._kifu.append((column, row))
         self._board[column, row] = self._current_side
+        self._update_runs(column, row, -1)
+        self._update_hashes(column, row, self._current_side)
+        self._update_candidates(column, row, 1)
+        self._update_codes(column, row, self._current_side + 1)
 
         # Check winner
-        direction = [
-            (0, 1),
-            (1, 1),
-            (1, 0),
-            (1, -1),
-            (0, -1),
-            (-1, -1),
-            (-1, 0),
-            (-1, 1),
-        ]
-        direction_cnt = [1] * 4
-        direction_path = [[(column, row)] for i in range(4)]
-        for i in range(8):
-            dc, dr = direction[i]
-            c, r = column + dc, row + dr
-            while (
-                c in range(self._BOARD_SIZE[0])
-                and r in range(self._BOARD_SIZE[1])
-                and self._board[c, r] == self._current_side
-            ):
-                direction_cnt[i % 4] += 1
-                direction_path[i % 4].append((c, r))
-                c += dc
-                r += dr
-            if direction_cnt[i % 4] >= 5:
+        fives = FIVES[self._current_side]
+        for d, (dc, dr) in enumerate(DIRECTIONS):
+            if fives[self._codes[d][column][row]]:
+                before, after = self.line_span(
+                    column, row, d, self._current_side
+                )
                 self._winner = self._current_side
-                self._winpath = direction_path[i % 4]
+                self._winpath = [(column, row)]
+                for i in range(1, before + 1):
+                    self._winpath.append((column - i * dc, row - i * dr))
+                for i in range(1, after + 1):
+                    self._winpath.append((column + i * dc, row + i * dr))
 
         self._current_side = not self._current_side
 
@@ -219,5 +482,549 @@ class Board:
         self._winpath = None
         self._available_place.add((self._kifu[-1][0], self._kifu[-1][1]))
         self._board[self._kifu[-1][0], self._kifu[-1][1]] = -1
+        self._update_runs(*self._kifu[-1], int(not self._current_side))
+        self._update_hashes(*self._kifu[-1], not self._current_side)
+        self._update_candidates(*self._kifu[-1], -1)
+        self._update_codes(*self._kifu[-1], -1 - (not self._current_side))
         self._current_side = not self._current_side
         self._kifu.pop()
+
+    def line_span(
+        self, column: int, row: int, direction: int, side: int
+    ) -> Tuple[int, int]:
+        """The pieces of one side right before and after the position.
+
+        Args:
+            column (int): The column of the position, start from 0.
+            row (int): The row of the position, start from 0.
+            direction (int): The index of the line direction in DIRECTIONS.
+            side (int): 0 or 1 for the black or white side, -1 for blank.
+
+        Returns:
+            Tuple[int, int]: 
+                The number of consecutive `side` pieces right before and right
+                after the position along the direction, the position itself 
+                is not counted.
+        """
+        runs = self._runs[side][direction]
+        return runs[0][column][row], runs[1][column][row]
+
+    def line_run(
+        self, column: int, row: int, direction: int, side: int = None
+    ) -> Tuple[int, int]:
+        """The run length and open ends through the position.
+
+        Args:
+            column (int): The column of the position, start from 0.
+            row (int): The row of the position, start from 0.
+            direction (int): The index of the line direction in DIRECTIONS.
+            side (int, optional): 
+                The side of the run, the position counts as a piece of this 
+                side even if it is blank. Defaults to the piece on the 
+                position.
+
+        Returns:
+            Tuple[int, int]: 
+                The length of the run, and the number (0 to 2) of its ends 
+                followed by a blank space.
+        """
+        if side == None:
+            side = int(self._board[column, row])
+        before, after = self.line_span(column, row, direction, side)
+        dc, dr = DIRECTIONS[direction]
+        open_ends = 0
+        for steps in (-before - 1, after + 1):
+            c, r = column + steps * dc, row + steps * dr
+            if (
+                0 <= c < self._BOARD_SIZE[0]
+                and 0 <= r < self._BOARD_SIZE[1]
+                and self._board[c, r] == -1
+            ):
+                open_ends += 1
+        return before + after + 1, open_ends
+
+    def line_code(self, column: int, row: int, direction: int) -> int:
+        """The pattern code of the neighbours of the position.
+
+        Args:
+            column (int): The column of the position, start from 0.
+            row (int): The row of the position, start from 0.
+            direction (int): The index of the line direction in DIRECTIONS.
+
+        Returns:
+            int: 
+                The pattern code of the cells around the position along the 
+                direction, see src.pattern.
+        """
+        return self._codes[direction][column][row]
+
+    def _update_codes(self, column: int, row: int, change: int) -> None:
+        """Update the pattern codes seeing the position, whose piece changed.
+
+        Args:
+            column (int): The column of the position, start from 0.
+            row (int): The row of the position, start from 0.
+            change (int): The change to the cell value of the position.
+        """
+        width, height = self._BOARD_SIZE
+        for d, (dc, dr) in enumerate(DIRECTIONS):
+            codes = self._codes[d]
+            for step, weight in OFFSETS:
+                # The position is `step` lines away from (c, r).
+                c, r = column - step * dc, row - step * dr
+                if 0 <= c < width and 0 <= r < height:
+                    codes[c][r] += change * weight
+
+    def _update_hashes(self, column: int, row: int, side: bool) -> None:
+        """Toggle the piece of the side on the position in the hashes.
+
+        Args:
+            column (int): The column of the position, start from 0.
+            row (int): The row of the position, start from 0.
+            side (bool): The side of the piece.
+        """
+        for symmetry, keys in enumerate(self._zobrist):
+            self._hashes[symmetry] ^= keys[side][column][row]
+
+    def _update_candidates(self, column: int, row: int, change: int) -> None:
+        """Update the candidates around the position, whose piece just changed.
+
+        Args:
+            column (int): The column of the position, start from 0.
+            row (int): The row of the position, start from 0.
+            change (int): 1 for a placed piece, -1 for a cancelled one.
+        """
+        width, height = self._BOARD_SIZE
+        for c in range(
+            max(column - CANDIDATE_DISTANCE, 0),
+            min(column + CANDIDATE_DISTANCE + 1, width),
+        ):
+            neighbours = self._neighbours[c]
+            for r in range(
+                max(row - CANDIDATE_DISTANCE, 0),
+                min(row + CANDIDATE_DISTANCE + 1, height),
+            ):
+                neighbours[r] += change
+                if neighbours[r] == 0:
+                    self._candidates.discard((c, r))
+                elif neighbours[r] == 1 and change > 0:
+                    # The first piece around, so the position is blank.
+                    self._candidates.add((c, r))
+        if change > 0:
+            self._candidates.discard((column, row))
+        elif self._neighbours[column][row] > 0:
+            self._candidates.add((column, row))
+
+    def _update_runs(self, column: int, row: int, previous: int) -> None:
+        """Update the line runs next to the position, whose piece just changed.
+
+        Only the runs of the previous piece and the current piece are touched,
+        and the update walks no further than the first position of another 
+        side along each direction.
+
+        Args:
+            column (int): The column of the position, start from 0.
+            row (int): The row of the position, start from 0.
+            previous (int): The previous piece on the position.
+        """
+        current = int(self._board[column, row])
+        for side in (previous, current):
+            for d, (dc, dr) in enumerate(DIRECTIONS):
+                for end, sign in ((0, 1), (1, -1)):
+                    # The positions after this one see it at their `end`.
+                    runs = self._runs[side][d][end]
+                    count = runs[column][row] + 1 if current == side else 0
+                    c, r = column + sign * dc, row + sign * dr
+                    while (
+                        0 <= c < self._BOARD_SIZE[0]
+                        and 0 <= r < self._BOARD_SIZE[1]
+                    ):
+                        runs[c][r] = count
+                        if self._board[c, r] != side:
+                            break
+                        count += 1
+                        c, r = c + sign * dc, r + sign * dr
+
+
+class _BitKifuView(KifuView):
+    """Read-only kifu view decoding the bit indices kept by BitBoard."""
+
+    __slots__ = ("_stride",)
+
+    def __init__(self, kifu: array, stride: int) -> None:
+        super().__init__(kifu)
+        self._stride = stride
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [divmod(i, self._stride) for i in self._kifu[index]]
+        return divmod(self._kifu[index], self._stride)
+
+    def __repr__(self) -> str:
+        return "KifuView(%r)" % (list(self),)
+
+
+class _BitPlaceView(PlaceView):
+    """Read-only view to the empty bits of the bitboards kept by BitBoard."""
+
+    __slots__ = ("_board_size", "_stride")
+
+    def __init__(
+        self, pieces: List[int], board_size: Tuple[int, int], stride: int
+    ) -> None:
+        super().__init__(pieces)
+        self._board_size = board_size
+        self._stride = stride
+
+    def __contains__(self, place) -> bool:
+        column, row = place
+        return (
+            0 <= column < self._board_size[0]
+            and 0 <= row < self._board_size[1]
+            and not (self._places[0] | self._places[1])
+            >> (column * self._stride + row)
+            & 1
+        )
+
+    def __iter__(self):
+        occupied = self._places[0] | self._places[1]
+        for column in range(self._board_size[0]):
+            for row in range(self._board_size[1]):
+                if not occupied >> (column * self._stride + row) & 1:
+                    yield (column, row)
+
+    def __len__(self) -> int:
+        occupied = self._places[0] | self._places[1]
+        return self._board_size[0] * self._board_size[1] - occupied.bit_count()
+
+    def __repr__(self) -> str:
+        return "PlaceView(%r)" % (set(self),)
+
+
+class BitBoard:
+    """A compact alternative to Board, which packs each side into a bitboard.
+
+    The position (column, row) of one side is stored as the bit
+    `column * (HEIGHT + 1) + row` of a single integer. The extra guard bit at
+    the end of every column keeps the shifted masks from wrapping into the
+    next column, so that the five in a row detection is a few shift-and-AND
+    operations. The public API is the same as Board.
+
+    Attributes:
+        timestamp: The time when the game start.
+        board_size: Size to the board.
+        current_side: The current side of the player.
+        winner: The final winner.
+        winpath: The critical pieces for the winner.
+        board: The read-only snapshot of the board of the game.
+        board_copy: A writable copy of the board of the game.
+        kifu: The read-only view to the kifu of the game.
+        kifu_copy: A copy of the kifu of the game.
+        available_place: The read-only view to the available places.
+        available_place_copy: A copy of the set of available places.
+        candidates: The read-only set of the places near the pieces.
+        competitor_black: The name of the black competitor.
+        competitor_white: The name of the white competitor.
+        zobrist_hash: The Zobrist hash of the position.
+        canonical_hash: The symmetry-canonical hash of the position.
+        canonical_symmetry: The symmetry mapping to the canonical image.
+
+    Functions:
+        place(column, row):
+            Attempt to place one piece to the given position.
+        cancel():
+            Try to cancel the previous place.
+        line_span(column, row, direction, side):
+            The pieces of one side right before and after the position.
+        line_run(column, row, direction[, side]):
+            The run length and open ends through the position.
+        line_code(column, row, direction):
+            The pattern code of the neighbours of the position.
+    """
+
+    __slots__ = (
+        "timestamp",
+        "competitor_black",
+        "competitor_white",
+        "_BOARD_SIZE",
+        "_STRIDE",
+        "_current_side",
+        "_winner",
+        "_winpath",
+        "_pieces",
+        "_kifu",
+        "_hash",
+    )
+
+    def __init__(
+        self,
+        board_size: Tuple[int, int] = None,
+        competitor_black: str = "",
+        competitor_white: str = "",
+    ) -> None:
+        """Initialization to the board.
+
+        Args:
+            board_size (Tuple[int, int], optional):
+                The size of the board. Defaults to DEFAULT_BOARD_SIZE.
+            competitor_black (str, optional):
+                The name of the black competitor. Defaults to "".
+            competitor_white (str, optional):
+                The name of thw white competitor. Defaults to "".
+        """
+        if board_size == None:
+            board_size = src.constants.DEFAULT_BOARD_SIZE
+        assert board_size[0] > 0 and board_size[1] > 0
+
+        self.timestamp = time.strftime(TIME_FORMAT, time.localtime(time.time()))
+        self._BOARD_SIZE = tuple(board_size)
+        self._STRIDE = board_size[1] + 1
+        self.competitor_black = competitor_black
+        self.competitor_white = competitor_white
+        self._current_side = False
+        self._winner = None
+        self._winpath = None
+        self._pieces = [0, 0]  # Bitboard of the black and the white side.
+        self._kifu = array("H")  # Bit index of each piece.
+        self._hash = 0
+
+    @property
+    def board_size(self) -> Tuple[int, int]:
+        """Size to the board, see Board.board_size."""
+        return self._BOARD_SIZE
+
+    @property
+    def current_side(self) -> bool:
+        """Current player's side, see Board.current_side."""
+        return self._current_side
+
+    @property
+    def winner(self):
+        """The final winner, see Board.winner."""
+        return self._winner
+
+    @property
+    def winpath(self):
+        """The critical pieces for the winner, see Board.winpath."""
+        return None if self._winpath == None else self._winpath.copy()
+
+    @property
+    def board(self):
+        """The board of the game, see Board.board.
+
+        Notice:
+            There is no array behind the bitboards, so this is a read-only 
+            snapshot decoded on every access rather than a live view.
+        """
+        board = self.board_copy
+        board.flags.writeable = False
+        return board
+
+    @property
+    def board_copy(self):
+        """A writable copy of the board of the game, see Board.board_copy."""
+        board = np.full(self._BOARD_SIZE, -1)
+        for i, index in enumerate(self._kifu):
+            board[divmod(index, self._STRIDE)] = i % 2
+        return board
+
+    @property
+    def kifu(self) -> Sequence:
+        """The read-only view to the kifu of the game, see Board.kifu."""
+        return _BitKifuView(self._kifu, self._STRIDE)
+
+    @property
+    def kifu_copy(self) -> List[Tuple[int, int]]:
+        """A copy of the kifu of the game, see Board.kifu_copy."""
+        return [divmod(index, self._STRIDE) for index in self._kifu]
+
+    @property
+    def available_place(self) -> AbstractSet:
+        """The read-only view to the available places, see 
+        Board.available_place.
+        """
+        return _BitPlaceView(self._pieces, self._BOARD_SIZE, self._STRIDE)
+
+    @property
+    def available_place_copy(self) -> Set[Tuple[int, int]]:
+        """A copy of the set of available places, see 
+        Board.available_place_copy.
+        """
+        return set(self.available_place)
+
+    @property
+    def candidates(self) -> AbstractSet:
+        """The available places near the pieces, see Board.candidates.
+
+        Notice:
+            The pieces are dilated by shifts on every access, one row or one 
+            column a time, and the guard bits are masked out after each shift
+            so that nothing leaks into the next column.
+        """
+        width, height = self._BOARD_SIZE
+        board_mask = (
+            ((1 << width * self._STRIDE) - 1)
+            // ((1 << self._STRIDE) - 1)
+            * ((1 << height) - 1)
+        )
+        occupied = self._pieces[0] | self._pieces[1]
+        near = occupied
+        for shift in (1, self._STRIDE):
+            for _ in range(CANDIDATE_DISTANCE):
+                near = (near | near << shift | near >> shift) & board_mask
+        near &= ~occupied
+        candidates = set()
+        while near:
+            lowest = near & -near
+            candidates.add(divmod(lowest.bit_length() - 1, self._STRIDE))
+            near ^= lowest
+        return PlaceView(candidates)
+
+    @property
+    def zobrist_hash(self) -> int:
+        """The Zobrist hash of the position, see Board.zobrist_hash."""
+        return self._hash
+
+    @property
+    def canonical_hash(self) -> int:
+        """The symmetry-canonical hash of the position, see 
+        Board.canonical_hash.
+
+        Notice:
+            Only the plain hash is kept by BitBoard, the hashes of the 
+            symmetric images are replayed from the kifu on every access.
+        """
+        return min(self._symmetry_hashes())
+
+    @property
+    def canonical_symmetry(self) -> int:
+        """The symmetry mapping the position to its canonical image, see 
+        Board.canonical_symmetry.
+        """
+        hashes = self._symmetry_hashes()
+        return hashes.index(min(hashes))
+
+    def _zobrist_key(self, column: int, row: int, side: bool) -> int:
+        """The Zobrist key of the piece of the side on the position."""
+        return zobrist_keys(self._BOARD_SIZE)[0][side][column][row]
+
+    def _symmetry_hashes(self) -> List[int]:
+        """The Zobrist hashes of the position mapped by each symmetry."""
+        zobrist = zobrist_keys(self._BOARD_SIZE)
+        hashes = [0] * len(zobrist)
+        for i, index in enumerate(self._kifu):
+            column, row = divmod(index, self._STRIDE)
+            for symmetry, keys in enumerate(zobrist):
+                hashes[symmetry] ^= keys[i % 2][column][row]
+        return hashes
+
+    def place(self, column, row) -> None:
+        """Attempt to place one piece to the given position.
+
+        Args:
+            column (int): The column of the position, start from 0.
+            row (int): The row of the position, start from 0.
+        """
+        assert (column, row) in self.available_place
+        assert self._winner == None
+        index = column * self._STRIDE + row
+        self._kifu.append(index)
+        self._hash ^= self._zobrist_key(column, row, self._current_side)
+        pieces = self._pieces[self._current_side] | 1 << index
+        self._pieces[self._current_side] = pieces
+
+        # Check winner, the shifts are the distance of the neighbour bit in
+        # the vertical, horizontal, diagonal and anti-diagonal directions.
+        for shift in (1, self._STRIDE, self._STRIDE + 1, self._STRIDE - 1):
+            five = pieces & pieces >> shift
+            five &= five >> 2 * shift
+            if five & pieces >> 4 * shift:
+                self._winner = self._current_side
+                self._winpath = [(column, row)]
+                for step in (shift, -shift):
+                    i = index + step
+                    while i >= 0 and pieces >> i & 1:
+                        self._winpath.append(divmod(i, self._STRIDE))
+                        i += step
+                break
+
+        self._current_side = not self._current_side
+
+    def cancel(self) -> None:
+        """Attempt to cancel the previous place."""
+        assert len(self._kifu) > 0
+        self._winner = None
+        self._winpath = None
+        self._current_side = not self._current_side
+        column, row = divmod(self._kifu[-1], self._STRIDE)
+        self._hash ^= self._zobrist_key(column, row, self._current_side)
+        self._pieces[self._current_side] &= ~(1 << self._kifu.pop())
+
+    def line_span(
+        self, column: int, row: int, direction: int, side: int
+    ) -> Tuple[int, int]:
+        """The pieces of one side right before and after the position, see 
+        Board.line_span.
+
+        Notice:
+            BitBoard keeps no counters, the span is walked bit by bit.
+        """
+        dc, dr = DIRECTIONS[direction]
+        shift = dc * self._STRIDE + dr
+        if side == -1:
+            width, height = self._BOARD_SIZE
+            pieces = ((1 << width * self._STRIDE) - 1) // (
+                (1 << self._STRIDE) - 1
+            ) * ((1 << height) - 1) & ~(self._pieces[0] | self._pieces[1])
+        else:
+            pieces = self._pieces[side]
+        index = column * self._STRIDE + row
+        span = []
+        for step in (-shift, shift):
+            count, i = 0, index + step
+            while i >= 0 and pieces >> i & 1:
+                count, i = count + 1, i + step
+            span.append(count)
+        return span[0], span[1]
+
+    def line_run(
+        self, column: int, row: int, direction: int, side: int = None
+    ) -> Tuple[int, int]:
+        """The run length and open ends through the position, see 
+        Board.line_run.
+        """
+        if side == None:
+            index = column * self._STRIDE + row
+            side = -1
+            for i in (0, 1):
+                if self._pieces[i] >> index & 1:
+                    side = i
+        before, after = self.line_span(column, row, direction, side)
+        dc, dr = DIRECTIONS[direction]
+        places = self.available_place
+        open_ends = 0
+        for steps in (-before - 1, after + 1):
+            if (column + steps * dc, row + steps * dr) in places:
+                open_ends += 1
+        return before + after + 1, open_ends
+
+    def line_code(self, column: int, row: int, direction: int) -> int:
+        """The pattern code of the neighbours of the position, see 
+        Board.line_code.
+
+        Notice:
+            BitBoard keeps no codes, the cells are read bit by bit.
+        """
+        width, height = self._BOARD_SIZE
+        dc, dr = DIRECTIONS[direction]
+        code = 0
+        for step, weight in OFFSETS:
+            c, r = column + step * dc, row + step * dr
+            if not (0 <= c < width and 0 <= r < height):
+                code += EDGE * weight
+                continue
+            index = c * self._STRIDE + r
+            for side in (0, 1):
+                if self._pieces[side] >> index & 1:
+                    code += (side + 1) * weight
+        return code
@@ -19,48 +19,265 @@ Description:
     The database interaction part, which is responsible for storing as well as 
     reading the chess games.
 """
-from typing import List
-import sqlite3, pickle
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+from functools import lru_cache
+import sqlite3, pickle, threading
+import numpy as np
 
 from src.constants import (
     DEFAULT_DATABASE_PATH,
+    DATABASE_BATCH_SIZE,
+    DATABASE_TIMEOUT,
+    DATABASE_PRAGMAS,
+    DATABASE_GET_VERSION,
+    DATABASE_SET_VERSION,
+    DATABASE_SELECT_KIFU,
+    DATABASE_UPDATE_KIFU,
     DATABASE_CREATE_TABLE,
     DATABASE_INSERT_BOARD,
     DATABASE_SELECT_BOARD,
+    DATABASE_SELECT_BOARD_BY_TIMESTAMP,
+    DATABASE_SELECT_SUMMARY,
+    DATABASE_COUNT_BOARD,
+    DATABASE_TABLE_INFO,
+    DATABASE_ADD_BOARD_SIZE_COLUMNS,
+    DATABASE_SELECT_BOARD_SIZES,
+    DATABASE_UPDATE_BOARD_SIZE,
+    DATABASE_CREATE_INDEXES,
     DATABASE_DELETE_BOARD,
+    DATABASE_HAS_BOARD,
+    DATABASE_CREATE_RATING_TABLE,
+    DATABASE_SELECT_RATING,
+    DATABASE_SELECT_RATINGS,
+    DATABASE_REPLACE_RATING,
+    DATABASE_DELETE_RATINGS,
+    DATABASE_DELETE_RATING,
+    DATABASE_CREATE_RATING_HISTORY_TABLE,
+    DATABASE_INSERT_RATING_HISTORY,
+    DATABASE_SELECT_RATINGS_BEFORE,
+    DATABASE_SELECT_LAST_RATED,
+    DATABASE_DELETE_RATING_HISTORY,
+    DATABASE_SELECT_RESULTS_SINCE,
+    DATABASE_SELECT_RESULTS,
+    DATABASE_SELECT_RESULT,
+    DATABASE_CREATE_PLAYER_STATS_TABLE,
+    DATABASE_ADD_PLAYER_STATS,
+    DATABASE_DELETE_EMPTY_PLAYER_STATS,
+    DATABASE_DELETE_PLAYER_STATS,
+    DATABASE_SELECT_PLAYER_STATS,
+    DATABASE_POSITION_INDEX,
+    DATABASE_HAS_POSITION_TABLE,
+    DATABASE_CREATE_POSITION_TABLE,
+    DATABASE_DROP_POSITION_TABLE,
+    DATABASE_INSERT_POSITION,
+    DATABASE_DELETE_POSITIONS,
+    DATABASE_DELETE_ALL_POSITIONS,
+    DATABASE_SELECT_GAMES_BY_POSITION,
 )
-from src.core import Board
+from src.core import Board, zobrist_keys
+from src.kifu import decode_cells, decode_kifu, encode_kifu
+from src.rating import Rating, rate_game
+
+NO_WINNER = -1  # The winner filter of the games without a winner.
+
+
+class GameSummary(NamedTuple):
+    """What the history shows of a stored game, read without the kifu.
+
+    Attributes:
+        timestamp: The timestamp of the game, which identifies it.
+        competitor_black: The name of the black competitor.
+        competitor_white: The name of the white competitor.
+        winner: 0 for black, 1 for white, None for no winner.
+        board_size: The size of the board.
+    """
+
+    timestamp: str
+    competitor_black: str
+    competitor_white: str
+    winner: int
+    board_size: Tuple[int, int]
+
+
+class KifuRecord(NamedTuple):
+    """A stored game as it is, decoded but not replayed on a board.
+
+    Attributes:
+        timestamp: The timestamp of the game, which identifies it.
+        competitor_black: The name of the black competitor.
+        competitor_white: The name of the white competitor.
+        board_size: The size of the board.
+        kifu: The moves of the game.
+        winner: 0 for black, 1 for white, None for no winner.
+    """
+
+    timestamp: str
+    competitor_black: str
+    competitor_white: str
+    board_size: Tuple[int, int]
+    kifu: List[Tuple[int, int]]
+    winner: int
+
+
+class PlayerStats(NamedTuple):
+    """The statistics of a player over the finished games.
+
+    Attributes:
+        games: The finished games.
+        wins: The games won.
+        losses: The games lost.
+        draws: The games drawn.
+        average_length: The mean number of the moves of the games.
+        elo: The Elo rating.
+    """
+
+    games: int
+    wins: int
+    losses: int
+    draws: int
+    average_length: float
+    elo: float
 
 
 class BoardDatabase:
     """Database to save boards.
+
+    Every thread has a connection of its own, opened as it first uses the 
+    database, so that the menus may read while a game is saved by another 
+    thread. The writes are made one at a time.
     
     Functions:
         __init__([database_path]):
             Open the database.
         append(board_to_save):
             Append the board to the database.
+        append_many(boards_to_save):
+            Append the boards to the database in one transaction.
+        batch([flush_size]):
+            A writer appending the boards a batch at a time.
         export():
             Export the list of boards in the database.
+        iter_boards([validate]):
+            Iterate over the boards in the database, one by one.
+        iter_kifu():
+            Iterate over the games in the database, without replaying them.
+        summaries([player, winner, board_size, offset, limit]):
+            Iterate over the summaries of the games, without the kifu.
+        count([player, winner, board_size]):
+            The number of the games.
+        exists(board_timestamp):
+            Whether the specified board is in the database.
+        load(board_timestamp[, validate]):
+            Load the specified board, determined by its timestamp.
         erase(board_timestamp):
             Erase the specified board, determined by its timestamp.
+        ratings():
+            The ratings of the players, the best first.
+        rebuild_ratings():
+            Rate all the stored games again.
+        player_stats():
+            The statistics of the players, the best rated first.
+        rebuild_player_stats():
+            Count all the stored games again.
+        find_games(board[, limit]):
+            The games reaching the position, by the position index.
+        rebuild_positions():
+            Index the positions of all the stored games again.
     """
 
-    def __init__(self, database_path: str = DEFAULT_DATABASE_PATH) -> None:
+    def __init__(
+        self,
+        database_path: str = DEFAULT_DATABASE_PATH,
+        position_index: bool = DATABASE_POSITION_INDEX,
+    ) -> None:
         """Initialization to the board database.
 
         Args:
             database_path (str, optional): 
                 The path to the database. If the file does not exist, it will
                 create a new one. Defaults to DEFAULT_DATABASE_PATH.
+            position_index (bool, optional): 
+                Whether to keep the position index, see find_games. It is 
+                built for the stored games once it is turned on, and dropped
+                once it is turned off. Defaults to DATABASE_POSITION_INDEX.
         """
-        self._conn = sqlite3.connect(database_path)
-        self._cur = self._conn.cursor()
-        self._cur.execute(DATABASE_CREATE_TABLE)
+        self._path = database_path
+        self._position_index = position_index
+        self._local = threading.local()
+        self._connections = {}  # thread -> its connection
+        self._connections_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        with self._write_lock:
+            self._create()
 
     def __del__(self):
-        self._cur.close()
-        self._conn.close()
+        for conn in self._connections.values():
+            conn.close()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The connection of the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn == None:
+            # Closed by __del__ from whichever thread, hence not checked.
+            conn = sqlite3.connect(
+                self._path, timeout=DATABASE_TIMEOUT, check_same_thread=False
+            )
+            conn.executescript(DATABASE_PRAGMAS)
+            self._local.conn = conn
+            self._local.cur = conn.cursor()
+            with self._connections_lock:
+                for thread in list(self._connections):
+                    if not thread.is_alive():
+                        self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    @property
+    def _cur(self) -> sqlite3.Cursor:
+        """The cursor of the connection of the current thread."""
+        self._conn  # Opened by the first use in the thread.
+        return self._local.cur
+
+    def _create(self) -> None:
+        """Create the tables, or bring an older database up to date.
+
+        The user_version of the database is the version of its schema, so 
+        that each migration runs once:
+            1: The board sizes and the kifu are binary, see _migrate_kifu.
+            2: The ratings with their history and the player statistics are
+               kept, and built once for the games stored before.
+        """
+        self._cur.execute(DATABASE_CREATE_TABLE)
+        columns = [x[1] for x in self._cur.execute(DATABASE_TABLE_INFO)]
+        if "board_width" not in columns:
+            # A database from before the board size columns.
+            self._cur.executescript(DATABASE_ADD_BOARD_SIZE_COLUMNS)
+            for timestamp, board_size in self._cur.execute(
+                DATABASE_SELECT_BOARD_SIZES
+            ).fetchall():
+                self._cur.execute(
+                    DATABASE_UPDATE_BOARD_SIZE,
+                    pickle.loads(board_size) + (timestamp,),
+                )
+            self._conn.commit()
+        version = self._cur.execute(DATABASE_GET_VERSION).fetchone()[0]
+        if version < 1:
+            self._migrate_kifu()
+        self._cur.executescript(DATABASE_CREATE_INDEXES)
+        self._cur.execute(DATABASE_CREATE_RATING_TABLE)
+        self._cur.execute(DATABASE_CREATE_RATING_HISTORY_TABLE)
+        self._cur.executescript(DATABASE_CREATE_PLAYER_STATS_TABLE)
+        if version < 2:
+            self.rebuild_ratings()
+            self.rebuild_player_stats()
+            self._cur.execute(DATABASE_SET_VERSION.format(2))
+            self._conn.commit()
+        if not self._position_index:
+            self._cur.execute(DATABASE_DROP_POSITION_TABLE)
+        elif self._cur.execute(DATABASE_HAS_POSITION_TABLE).fetchone() == None:
+            self._cur.executescript(DATABASE_CREATE_POSITION_TABLE)
+            self.rebuild_positions()
 
     def append(self, board_to_save: Board) -> None:
         """Append the board to the database.
@@ -68,18 +285,97 @@ class BoardDatabase:
         Args:
             board_to_save (board): The specific board to save.
         """
-        self._cur.execute(
-            DATABASE_INSERT_BOARD,
-            (
-                board_to_save.timestamp,
-                board_to_save.competitor_black,
-                board_to_save.competitor_white,
-                pickle.dumps(board_to_save.board_size),
-                pickle.dumps(board_to_save.kifu),
-                board_to_save.winner,
-            ),
-        )
-        self._conn.commit()
+        self.append_many([board_to_save])
+
+    def append_many(self, boards_to_save: Iterable[Board]) -> int:
+        """Append the boards to the database in one transaction.
+
+        The rows are written DATABASE_BATCH_SIZE at a time by executemany, 
+        and the ratings and the statistics of the players are updated in 
+        memory and written once at the end. Nothing is written if any board
+        fails, such as for a timestamp already in the database.
+
+        The games are rated in the order of their timestamps. A game older 
+        than the last rated one, such as an imported one, makes the games 
+        from its timestamp on rated again, see _rerate.
+
+        Args:
+            boards_to_save (Iterable[Board]): The boards to save, in order.
+
+        Returns:
+            int: The number of the boards saved.
+        """
+        ratings, stats, history = {}, {}, []
+        rows, positions, count = [], [], 0
+        self._write_lock.acquire()
+        try:
+            last = self._cur.execute(DATABASE_SELECT_LAST_RATED).fetchone()[0]
+            last = "" if last == None else last
+            backdated = None  # The oldest game older than the last rated.
+            for board in boards_to_save:
+                rows.append(
+                    (
+                        board.timestamp,
+                        board.competitor_black,
+                        board.competitor_white,
+                        bytes(board.board_size),
+                        encode_kifu(board.board_size, board.kifu_copy),
+                        board.winner,
+                        *board.board_size,
+                    )
+                )
+                if board.winner != None or len(board.available_place) == 0:
+                    names = (board.competitor_black, board.competitor_white)
+                    timestamp = board.timestamp
+                    if backdated == None and timestamp > last:
+                        self._rate(
+                            timestamp, *names, board.winner, ratings, history
+                        )
+                        last = timestamp
+                    elif backdated == None or timestamp < backdated:
+                        backdated = timestamp
+                    self._count_game(
+                        *names, board.winner, len(board.kifu), stats=stats
+                    )
+                if self._position_index:
+                    positions += _position_rows(
+                        board.timestamp, board.board_size, board.kifu
+                    )
+                if len(rows) >= DATABASE_BATCH_SIZE:
+                    self._cur.executemany(DATABASE_INSERT_BOARD, rows)
+                    if len(positions) > 0:
+                        self._cur.executemany(
+                            DATABASE_INSERT_POSITION, positions
+                        )
+                    count += len(rows)
+                    rows, positions = [], []
+            self._cur.executemany(DATABASE_INSERT_BOARD, rows)
+            if len(positions) > 0:
+                # The table is dropped while the index is turned off.
+                self._cur.executemany(DATABASE_INSERT_POSITION, positions)
+            count += len(rows)
+            self._write_tallies(ratings, stats, history)
+            if backdated != None:
+                self._rerate(backdated)
+            self._conn.commit()
+        except:
+            self._conn.rollback()
+            raise
+        finally:
+            self._write_lock.release()
+        return count
+
+    def batch(self, flush_size: int = None) -> "BatchWriter":
+        """A writer appending the boards a batch at a time, see BatchWriter.
+
+        Args:
+            flush_size (int, optional): 
+                The boards of a batch. Defaults to DATABASE_BATCH_SIZE.
+
+        Returns:
+            BatchWriter: The writer, to be used in a with statement.
+        """
+        return BatchWriter(self, flush_size)
 
     def export(self) -> List[Board]:
         """Export the list of boards in the database.
@@ -87,25 +383,173 @@ class BoardDatabase:
         Returns:
             List[board]: A list of the board stored in the database.
         """
-        result = self._cur.execute(DATABASE_SELECT_BOARD)
-        boards = list()
-        for (
+        return list(self.iter_boards())
+
+    def iter_boards(self, validate: bool = True) -> Iterator[Board]:
+        """Iterate over the boards in the database, replaying one game at a 
+        time, so that the rows are not all held at once.
+
+        Args:
+            validate (bool, optional): 
+                Whether to check the replayed winner against the stored one.
+                Defaults to True.
+
+        Yields:
+            Board: The boards stored in the database.
+        """
+        # A cursor of its own, which the other queries do not reset.
+        cursor = self._conn.cursor()
+        try:
+            for record in cursor.execute(DATABASE_SELECT_BOARD):
+                yield self._to_board(record, validate)
+        finally:
+            cursor.close()
+
+    def iter_kifu(self) -> Iterator[KifuRecord]:
+        """Iterate over the games in the database as they are stored, which
+        is much faster than iter_boards when the boards are not needed.
+
+        Yields:
+            KifuRecord: The games stored in the database.
+        """
+        cursor = self._conn.cursor()
+        try:
+            for record in cursor.execute(DATABASE_SELECT_BOARD):
+                timestamp, black, white, _, kifu, winner = record
+                yield KifuRecord(
+                    timestamp, black, white, *decode_kifu(kifu), winner
+                )
+        finally:
+            cursor.close()
+
+    def summaries(
+        self,
+        player: str = None,
+        winner: int = None,
+        board_size: Tuple[int, int] = None,
+        offset: int = 0,
+        limit: int = None,
+    ) -> Iterator[GameSummary]:
+        """Iterate over the summaries of the games in the order of their 
+        timestamps, which neither read the kifu nor replay any game.
+
+        The filters and the order are served by the indexes, so that a page
+        costs the same however many games are stored.
+
+        Args:
+            player (str, optional): 
+                Only the games of the player, of either side. Defaults to all.
+            winner (int, optional): 
+                Only the games won by the side, 0 for black and 1 for white, 
+                or NO_WINNER for the games without a winner. Defaults to all.
+            board_size (Tuple[int, int], optional): 
+                Only the games on the board of the size. Defaults to all.
+            offset (int, optional): 
+                The games skipped before the first one. Defaults to 0.
+            limit (int, optional): 
+                The most games. Defaults to no limit.
+
+        Yields:
+            GameSummary: The summaries of the games in the database.
+        """
+        where, args = self._filter(player, winner, board_size)
+        args += [-1 if limit == None else limit, offset]
+        cursor = self._conn.cursor()
+        try:
+            for row in cursor.execute(
+                DATABASE_SELECT_SUMMARY.format(where), args
+            ):
+                yield GameSummary(*row[:4], tuple(row[4:]))
+        finally:
+            cursor.close()
+
+    def count(
+        self,
+        player: str = None,
+        winner: int = None,
+        board_size: Tuple[int, int] = None,
+    ) -> int:
+        """The number of the games, see summaries for the filters.
+
+        Returns:
+            int: The number of the games.
+        """
+        where, args = self._filter(player, winner, board_size)
+        return self._cur.execute(
+            DATABASE_COUNT_BOARD.format(where), args
+        ).fetchone()[0]
+
+    @staticmethod
+    def _filter(
+        player: str, winner: int, board_size: Tuple[int, int]
+    ) -> Tuple[str, list]:
+        """The WHERE clause of the filters and its parameters."""
+        clauses, args = [], []
+        if player != None:
+            clauses.append("(competitor_black=? OR competitor_white=?)")
+            args += [player, player]
+        if winner == NO_WINNER:
+            clauses.append("winner IS NULL")
+        elif winner != None:
+            clauses.append("winner=?")
+            args.append(winner)
+        if board_size != None:
+            clauses.append("board_width=? AND board_height=?")
+            args += list(board_size)
+        if len(clauses) == 0:
+            return "", args
+        return "WHERE " + " AND ".join(clauses), args
+
+    def exists(self, board_timestamp: str) -> bool:
+        """Whether the specified board is in the database.
+
+        Args:
+            board_timestamp (str): The timestamp to the specified board.
+
+        Returns:
+            bool: True if a board of the timestamp is stored.
+        """
+        return (
+            self._cur.execute(DATABASE_HAS_BOARD, (board_timestamp,)).fetchone()
+            != None
+        )
+
+    def load(self, board_timestamp: str, validate: bool = True) -> Board:
+        """Load the specified board, determined by its timestamp.
+
+        Args:
+            board_timestamp (str): The timestamp to the specified board.
+            validate (bool, optional): 
+                Whether to check the replayed winner against the stored one.
+                Defaults to True.
+
+        Returns:
+            Board: The board, or None if there is no such board.
+        """
+        row = self._cur.execute(
+            DATABASE_SELECT_BOARD_BY_TIMESTAMP, (board_timestamp,)
+        ).fetchone()
+        return None if row == None else self._to_board(row, validate)
+
+    @staticmethod
+    def _to_board(record: Tuple, validate: bool) -> Board:
+        """Rebuild the board from its row, see DATABASE_SELECT_BOARD."""
+        (
             timestamp,
             competitor_black,
             competitor_white,
             board_size,
             kifu,
             winner,
-        ) in result:
-            tmp = Board(
-                pickle.loads(board_size), competitor_black, competitor_white
-            )
-            tmp.timestamp = timestamp
-            for col, row in pickle.loads(kifu):
-                tmp.place(col, row)
+        ) = record
+        board_size, kifu = decode_kifu(kifu)
+        tmp = Board(board_size, competitor_black, competitor_white)
+        tmp.timestamp = timestamp
+        for col, row in kifu:
+            tmp.place(col, row)
+        if validate:
             assert tmp.winner == winner
-            boards.append(tmp)
-        return boards
+        return tmp
 
     def erase(self, board_timestamp) -> None:
         """Erase the specified board, determined by its timestamp.
@@ -113,5 +557,367 @@ class BoardDatabase:
         Args:
             board_timestamp (str): The timestamp to the specified board.
         """
-        self._cur.execute(DATABASE_DELETE_BOARD, (board_timestamp,))
+        with self._write_lock:
+            result = self._cur.execute(
+                DATABASE_SELECT_RESULT, (board_timestamp,)
+            ).fetchone()
+            if result != None:
+                black, white, kifu, winner = result
+                moves = _finished_moves(kifu, winner)
+                if moves != None:
+                    self._count_game(black, white, winner, moves, -1)
+            self._cur.execute(DATABASE_DELETE_BOARD, (board_timestamp,))
+            if self._position_index:
+                self._cur.execute(DATABASE_DELETE_POSITIONS, (board_timestamp,))
+            self._rerate(board_timestamp)
+            self._conn.commit()
+
+    def ratings(self) -> List[Tuple[str, Rating]]:
+        """The ratings of the players, which are kept up to date as the games
+        are appended, so that nothing is replayed.
+
+        Returns:
+            List[Tuple[str, Rating]]: The players and their ratings, by Elo.
+        """
+        return [
+            (player, Rating(*rating))
+            for player, *rating in self._cur.execute(DATABASE_SELECT_RATINGS)
+        ]
+
+    def rebuild_ratings(self) -> None:
+        """Rate all the stored games again, in the order of their timestamps."""
+        with self._write_lock:
+            self._cur.execute(DATABASE_DELETE_RATINGS)
+            self._cur.execute(DATABASE_DELETE_RATING_HISTORY, ("",))
+            self._rerate("")
+            self._conn.commit()
+
+    def _rerate(self, since: str) -> None:
+        """Rate the games from the timestamp on again, without committing it.
+
+        The ratings depend on the order of the games, so the games after an
+        erased one are rated again. They start from the ratings the players
+        had before their first game from the timestamp on, which are kept in
+        the rating history, so that the earlier games are not replayed.
+
+        Args:
+            since (str): The earliest timestamp to rate again.
+        """
+        ratings = {
+            player: Rating(*rating)
+            for player, _, *rating in self._cur.execute(
+                DATABASE_SELECT_RATINGS_BEFORE, (since,)
+            ).fetchall()
+        }
+        self._cur.execute(DATABASE_DELETE_RATING_HISTORY, (since,))
+        history = []
+        for timestamp, black, white, kifu, winner in self._cur.execute(
+            DATABASE_SELECT_RESULTS_SINCE, (since,)
+        ).fetchall():
+            if _finished_moves(kifu, winner) != None:
+                self._rate(timestamp, black, white, winner, ratings, history)
+        for player in [x for x, rating in ratings.items() if rating.games == 0]:
+            # Whose only games are erased.
+            del ratings[player]
+            self._cur.execute(DATABASE_DELETE_RATING, (player,))
+        self._write_tallies(ratings, history=history)
+
+    def player_stats(self) -> List[Tuple[str, PlayerStats]]:
+        """The statistics of the players, which are kept up to date as the 
+        games are appended and erased, read by one query.
+
+        Returns:
+            List[Tuple[str, PlayerStats]]: The players and their statistics,
+                by Elo.
+        """
+        return [
+            (player, PlayerStats(*stats))
+            for player, *stats in self._cur.execute(
+                DATABASE_SELECT_PLAYER_STATS
+            )
+        ]
+
+    def rebuild_player_stats(self) -> None:
+        """Count all the stored games again."""
+        with self._write_lock:
+            self._cur.execute(DATABASE_DELETE_PLAYER_STATS)
+            results = self._cur.execute(DATABASE_SELECT_RESULTS).fetchall()
+            stats = {}
+            for black, white, kifu, winner in results:
+                moves = _finished_moves(kifu, winner)
+                if moves != None:
+                    self._count_game(black, white, winner, moves, stats=stats)
+            self._write_tallies(stats=stats)
+            self._conn.commit()
+
+    def find_games(
+        self, board: Board, limit: int = None
+    ) -> List[Tuple[GameSummary, int]]:
+        """The games reaching the position, or any of its symmetric images,
+        found by one lookup of the position index.
+
+        Args:
+            board (Board): The position.
+            limit (int, optional): The most games. Defaults to no limit.
+
+        Returns:
+            List[Tuple[GameSummary, int]]: 
+                The games in the order of their timestamps, with the ply 
+                after which the position is reached.
+        """
+        if not self._position_index:
+            raise ValueError("The position index is turned off")
+        args = (
+            _signed(board.canonical_hash),
+            *board.board_size,
+            -1 if limit == None else limit,
+        )
+        return [
+            (GameSummary(*row[:4], tuple(row[4:6])), row[6])
+            for row in self._cur.execute(
+                DATABASE_SELECT_GAMES_BY_POSITION, args
+            )
+        ]
+
+    def rebuild_positions(self) -> None:
+        """Index the positions of all the stored games again."""
+        with self._write_lock:
+            self._cur.execute(DATABASE_DELETE_ALL_POSITIONS)
+            games = self._cur.execute(DATABASE_SELECT_KIFU).fetchall()
+            for timestamp, _, kifu in games:
+                self._cur.executemany(
+                    DATABASE_INSERT_POSITION,
+                    _position_rows(timestamp, *decode_kifu(kifu)),
+                )
+            self._conn.commit()
+
+    def _count_game(
+        self,
+        black: str,
+        white: str,
+        winner: int,
+        moves: int,
+        sign: int = 1,
+        stats: Dict[str, List[int]] = None,
+    ) -> None:
+        """Count a finished game in the statistics, without committing it.
+
+        Args:
+            black (str): The name of the black competitor.
+            white (str): The name of the white competitor.
+            winner (int): 0 for black, 1 for white, None for a draw.
+            moves (int): The number of the moves of the game.
+            sign (int, optional): 
+                1 to count the game, -1 to take it back. Defaults to 1.
+            stats (Dict[str, List[int]], optional): 
+                The changes to the statistics to write later by 
+                _write_tallies, added to instead of the table. Defaults to 
+                None.
+        """
+        if black == white:
+            return
+        for side, player in enumerate((black, white)):
+            change = [
+                sign,
+                sign * (winner == side),
+                sign * (winner == 1 - side),
+                sign * (winner == None),
+                sign * moves,
+            ]
+            if stats == None:
+                self._cur.execute(DATABASE_ADD_PLAYER_STATS, [player] + change)
+            else:
+                total = stats.setdefault(player, [0] * len(change))
+                for i, x in enumerate(change):
+                    total[i] += x
+        if sign < 0:
+            self._cur.execute(DATABASE_DELETE_EMPTY_PLAYER_STATS)
+
+    def _migrate_kifu(self) -> None:
+        """Convert the pickled board sizes and kifu of a database before the
+        version 1 into the binary encoding, see src.kifu.
+
+        The board size column keeps the width and the height as two bytes,
+        while the encoded kifu carries them as well.
+        """
+        rows = self._cur.execute(DATABASE_SELECT_KIFU).fetchall()
+        for timestamp, board_size, kifu in rows:
+            board_size = pickle.loads(board_size)
+            self._cur.execute(
+                DATABASE_UPDATE_KIFU,
+                (
+                    bytes(board_size),
+                    encode_kifu(board_size, pickle.loads(kifu)),
+                    timestamp,
+                ),
+            )
+        self._cur.execute(DATABASE_SET_VERSION.format(1))
         self._conn.commit()
+
+    def _rate(
+        self,
+        timestamp: str,
+        black: str,
+        white: str,
+        winner: int,
+        ratings: Dict[str, Rating],
+        history: List[tuple],
+    ) -> None:
+        """Rate a finished game in memory, to be written by _write_tallies.
+
+        Args:
+            timestamp (str): The timestamp of the game.
+            black (str): The name of the black competitor.
+            white (str): The name of the white competitor.
+            winner (int): 0 for black, 1 for white, None for a draw.
+            ratings (Dict[str, Rating]): 
+                The ratings, which are read and updated instead of the table,
+                as far as they are kept in it.
+            history (List[tuple]): 
+                The rows of the rating history, to which the ratings of the 
+                players before the game are added.
+        """
+        if black == white:
+            return
+        current = []
+        for player in (black, white):
+            if player in ratings:
+                current.append(ratings[player])
+                continue
+            rating = self._cur.execute(
+                DATABASE_SELECT_RATING, (player,)
+            ).fetchone()
+            current.append(Rating() if rating == None else Rating(*rating))
+        for player, before, rating in zip(
+            (black, white), current, rate_game(*current, winner)
+        ):
+            history.append((timestamp, player) + before)
+            ratings[player] = rating
+
+    def _write_tallies(
+        self,
+        ratings: Dict[str, Rating] = None,
+        stats: Dict[str, List[int]] = None,
+        history: List[tuple] = None,
+    ) -> None:
+        """Write the ratings, the rating history and the changes to the 
+        statistics kept in memory by _rate and _count_game, without 
+        committing them."""
+        if ratings != None:
+            self._cur.executemany(
+                DATABASE_REPLACE_RATING,
+                [(player,) + rating for player, rating in ratings.items()],
+            )
+        if history != None:
+            self._cur.executemany(DATABASE_INSERT_RATING_HISTORY, history)
+        if stats != None:
+            self._cur.executemany(
+                DATABASE_ADD_PLAYER_STATS,
+                [[player] + change for player, change in stats.items()],
+            )
+
+
+def _signed(value: int) -> int:
+    """The 64-bit hash as a signed integer, which SQLite can store."""
+    return value - (1 << 64) if value >> 63 else value
+
+
+@lru_cache(maxsize=None)
+def _zobrist_array(board_size: Tuple[int, int]) -> np.ndarray:
+    """The Zobrist keys of the board as an array, see zobrist_keys."""
+    return np.array(zobrist_keys(board_size), dtype=np.uint64)
+
+
+def _position_rows(
+    timestamp: str, board_size: Tuple[int, int], kifu: List[Tuple[int, int]]
+) -> List[Tuple[int, str, int]]:
+    """The rows of the position index of a game.
+
+    The canonical hashes are worked out from the Zobrist keys as Board does,
+    all the plies at once, without replaying the game on a board.
+
+    Args:
+        timestamp (str): The timestamp of the game.
+        board_size (Tuple[int, int]): The size of the board.
+        kifu (List[Tuple[int, int]]): The moves of the game.
+
+    Returns:
+        List[Tuple[int, str, int]]: 
+            The canonical hash, the timestamp and the ply of the position 
+            after every move.
+    """
+    if len(kifu) == 0:
+        return []
+    columns, rows = np.array(kifu, dtype=np.intp).T
+    sides = np.arange(len(kifu)) % 2
+    keys = _zobrist_array(tuple(board_size))[:, sides, columns, rows]
+    hashes = np.bitwise_xor.accumulate(keys, axis=1).min(axis=0)
+    return [
+        (hash, timestamp, ply)
+        for ply, hash in enumerate(hashes.view(np.int64).tolist(), 1)
+    ]
+
+
+def _finished_moves(kifu: bytes, winner: int) -> int:
+    """The number of the moves of a finished game.
+
+    Args:
+        kifu (bytes): The encoded kifu, see src.kifu.
+        winner (int): The stored winner.
+
+    Returns:
+        int: The number of the moves, or None if the game is not finished.
+    """
+    (width, height), cells = decode_cells(kifu)
+    if winner != None or len(cells) == width * height:
+        return len(cells)
+    return None
+
+
+class BatchWriter:
+    """The writer appending the boards to the database a batch at a time, 
+    each batch in one transaction.
+
+    The boards left are written when the with statement ends, unless by an
+    exception.
+
+    Functions:
+        append(board_to_save): Append the board, written with its batch.
+        flush(): Write the boards appended so far.
+    """
+
+    def __init__(self, database: BoardDatabase, flush_size: int = None):
+        """Initialization to the writer.
+
+        Args:
+            database (BoardDatabase): The database to write to.
+            flush_size (int, optional): 
+                The boards of a batch. Defaults to DATABASE_BATCH_SIZE.
+        """
+        self._database = database
+        self._flush_size = (
+            DATABASE_BATCH_SIZE if flush_size == None else flush_size
+        )
+        self._boards = []
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type == None:
+            self.flush()
+
+    def append(self, board_to_save: Board) -> None:
+        """Append the board, which is written once the batch is full.
+
+        Args:
+            board_to_save (Board): The specific board to save.
+        """
+        self._boards.append(board_to_save)
+        if len(self._boards) >= self._flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the boards appended so far."""
+        boards, self._boards = self._boards, []
+        self._database.append_many(boards)
@@ -276,6 +276,7 @@ class GameScreen(Screen):
         self._sub_widgets.append(self._boardUI)
 
         def save_and_exit():
+            self._boardUI.stop()
             DATABASE.append(self._board)
             pygame.event.post(pygame.event.Event(SCREEN_CHANGE, screen=2))
 
@@ -432,6 +433,8 @@ class GameScreen(Screen):
     def _shift_out(self, event: pygame.event.Event = None):
         assert self._visible == True
 
+        if hasattr(self, "_boardUI"):
+            self._boardUI.stop()
         if event.type == QUIT:
             self._stop_loop = 0
             return
@@ -19,7 +19,6 @@ Description: The main screen of the game.
 """
 import pygame
 from pygame.constants import QUIT
-from collections import defaultdict
 from typing import List
 
 import src.constants
@@ -45,7 +44,7 @@ from src.display.widget.board import BoardUI, MonkeyUIPlayer
 from src.display.widget.button import Button
 from src.display.widget.input_box import InputBox
 from src.display.widget.logo import LOGO
-from src.display.widget.table import Table
+from src.display.widget.table import PagedTable, Table
 from src.display.widget.text import Text
 
 MAINMENU_ID = 0
@@ -335,23 +334,19 @@ class HistoryMenu(Widget):
         )
 
     def restore(self):
-        if len(self._history_table.boards) > 0:
-            src.constants.LAST_BOARD = self._history_table.boards[
-                self._history_table.active_item
-            ]
+        summary = self._history_table.active_summary
+        if summary != None:
+            src.constants.LAST_BOARD = DATABASE.load(summary.timestamp)
             pygame.event.post(pygame.event.Event(SCREEN_CHANGE, screen=3))
 
     def delete(self):
-        if len(self._history_table.boards) > 0:
-            DATABASE.erase(
-                self._history_table.boards[
-                    self._history_table.active_item
-                ].timestamp
-            )
+        summary = self._history_table.active_summary
+        if summary != None:
+            DATABASE.erase(summary.timestamp)
             self._board.load_board()
             self._history_table.refresh()
 
-    class history_table(Table):
+    class history_table(PagedTable):
         def __init__(
             self,
             parent: Widget,
@@ -360,40 +355,48 @@ class HistoryMenu(Widget):
             surface: pygame.Surface = None,
             present_number: int = 4,
         ) -> None:
-            self._text_list = []
-            super().__init__(
-                parent, rect, surface, self._text_list, present_number
-            )
+            super().__init__(parent, rect, surface, present_number)
             self._board = board
 
         @property
-        def boards(self):
-            return self._boards
+        def active_summary(self):
+            if self._active_item == None:
+                return None
+            return self.row(self._active_item)
 
         @property
         def active_item(self):
             return self._active_item
 
-        def refresh(self):
-            self._boards = DATABASE.export()
-            text_list = [
-                [x.timestamp, x.competitor_black + " vs " + x.competitor_white]
-                for x in self._boards
+        def _fetch(self, offset, limit):
+            return list(DATABASE.summaries(offset=offset, limit=limit))
+
+        def _row_text(self, row):
+            return [
+                row.timestamp,
+                row.competitor_black + " vs " + row.competitor_white,
             ]
-            if self._text_list != text_list:
-                self.set_text_list(text_list)
-                self._text_list = text_list
+
+        def _load_active_item(self):
+            # Only the game shown is replayed, the stored one is trusted.
+            self._board.load_board(
+                DATABASE.load(self.active_summary.timestamp, validate=False)
+            )
+
+        def refresh(self):
+            self.set_item_count(DATABASE.count())
+            summary = self.active_summary
             if (
-                len(self._boards) > 0
-                and self._board.board != self._boards[self._active_item]
+                summary != None
+                and self._board.board.timestamp != summary.timestamp
             ):
-                self._board.load_board(self._boards[self._active_item])
+                self._load_active_item()
 
         def _shift_in(self):
             self._board.editable = False
             self.refresh()
-            if len(self._boards) > 0:
-                self._board.load_board(self._boards[self._active_item])
+            if self._active_item != None:
+                self._load_active_item()
             return super()._shift_in()
 
         def _shift_out(self):
@@ -402,7 +405,7 @@ class HistoryMenu(Widget):
             return super()._shift_out()
 
         def _active_item_change(self):
-            self._board.load_board(self._boards[self._active_item])
+            self._load_active_item()
 
 
 class StatisticMenu(Widget):
@@ -453,21 +456,15 @@ class StatisticMenu(Widget):
             )
 
         def gen_textlist(self):
-            self._boards = [
-                board for board in DATABASE.export() if board.winner != None
-            ]
-            count = defaultdict(int)
-            for board in self._boards:
-                if board.winner == 0:
-                    count[board.competitor_black] += 1
-                    count[board.competitor_white] -= 1
-                else:
-                    count[board.competitor_black] -= 1
-                    count[board.competitor_white] += 1
-            count = sorted(count.items(), key=lambda x: x[1], reverse=True)
             text_list = []
-            for key, val in count:
-                text_list.append(["Player: " + key, "Score: " + str(val)])
+            for player, stats in DATABASE.player_stats():
+                text_list.append(
+                    [
+                        "Player: " + player,
+                        "Elo: %d W/D/L: %d/%d/%d"
+                        % (stats.elo, stats.wins, stats.draws, stats.losses),
+                    ]
+                )
             return text_list
 
         def _shift_in(self):
@@ -120,7 +120,7 @@ class HumanUIPlayer(UIPlayer):
 
 
 class RobotUIPlayer(UIPlayer, RobotPlayer):
-    pass
+    pondering = True
 
 
 class BoardUI(Widget):
@@ -165,6 +165,7 @@ class BoardUI(Widget):
         else:
             self._current_player = self._board.current_side
 
+        self.stop()
         try:
             del self._player
         except:
@@ -262,7 +263,9 @@ class BoardUI(Widget):
             play_sound("sound/sound2.ogg")
         self._sub_widgets.append(piece)
 
+        # The robot keeps pondering, the reply may be the one it expects.
         try:
+            self._player.stop()
             del self._player
         except:
             pass
@@ -288,6 +291,7 @@ class BoardUI(Widget):
             return
         self._current_player = self._board._current_side
 
+        self.stop()
         try:
             del self._player
         except:
@@ -295,6 +299,15 @@ class BoardUI(Widget):
         self._player = self._player_list[self._current_player](self)
         self._player.place_a_piece()
 
+    def stop(self) -> None:
+        """Stop the current player thinking, whose move is dropped anyway, and
+        the robot pondering."""
+        try:
+            self._player.stop()
+        except:
+            pass
+        RobotPlayer.stop_pondering()
+
     def _draw_begin(self) -> None:
         self._board_background.draw()
         self._surface_raw.blit(surface_blur(self._surface_raw, 3), (0, 0))
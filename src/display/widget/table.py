@@ -25,7 +25,7 @@ from pygame.constants import (
     BUTTON_WHEELDOWN,
     BUTTON_WHEELUP,
 )
-from typing import List
+from typing import Any, List
 
 from src.display.widget import Widget
 from src.display.tool import play_sound
@@ -36,6 +36,7 @@ from src.constants import (
     TEXT_FONT,
     EFFECT_DURATION_TINY,
     EFFECT_DURATION_NORMAL,
+    TABLE_PAGE_SIZE,
 )
 from src.display.effect import alpha_effect, blur_effect, surface_blur
 
@@ -63,7 +64,7 @@ class Table(Widget):
         self.set_text_list(text_list)
 
         def _mouse_button_down(event: pygame.event.Event):
-            if self._visible and len(self._sub_widgets) > 0:
+            if self._visible and self._item_count() > 0:
                 if (
                     self._abs_rect.collidepoint(event.pos)
                     and event.button == BUTTON_LEFT
@@ -73,20 +74,19 @@ class Table(Widget):
                     ) // self._item_height
                     if (
                         self._active_item != y + self._display_offset
-                        and len(self._sub_widgets) > y + self._display_offset
+                        and self._item_count() > y + self._display_offset
                     ):
                         play_sound("sound/sound1.ogg")
-                        self._sub_widgets[self._active_item].activate = False
-                        self._active_item = y + self._display_offset
-                        self._sub_widgets[self._active_item].activate = True
+                        self._set_active_item(y + self._display_offset)
                         self._active_item_change()
 
         def _mouse_scroll(event: pygame.event.Event):
-            if self._visible and len(self._sub_widgets) > 0:
+            if self._visible and self._item_count() > 0:
                 if self._abs_rect.collidepoint(event.pos):
                     if event.button == BUTTON_WHEELDOWN:
-                        if self._display_offset + self._present_number < len(
-                            self._sub_widgets
+                        if (
+                            self._display_offset + self._present_number
+                            < self._item_count()
                         ):
                             self._display_offset += 1
                     elif event.button == BUTTON_WHEELUP:
@@ -99,15 +99,29 @@ class Table(Widget):
     def _active_item_change(self):
         pass
 
+    def _item_count(self) -> int:
+        return len(self._sub_widgets)
+
+    def _item(self, index: int) -> Table.Item:
+        return self._sub_widgets[index]
+
+    def _set_active_item(self, index: int) -> None:
+        self._item(self._active_item).activate = False
+        self._active_item = index
+        self._item(self._active_item).activate = True
+
+    def _make_item(self, text: List[str]) -> Table.Item:
+        tmp = pygame.Surface(
+            (self._surface.get_size()[0], self._item_height)
+        ).convert_alpha()
+        return Table.Item(self, tmp, text)
+
     def set_text_list(self, text_list: List[List[str]] = []) -> None:
         self._sub_widgets = []
 
         if len(text_list) > 0:
             for text in text_list:
-                tmp = pygame.Surface(
-                    (self._surface.get_size()[0], self._item_height)
-                ).convert_alpha()
-                self._sub_widgets.append(Table.Item(self, tmp, text))
+                self._sub_widgets.append(self._make_item(text))
             self._active_item = 0
             self._display_offset = 0
             self._sub_widgets[0].activate = True
@@ -171,7 +185,7 @@ class Table(Widget):
                 self._display_offset + self._present_number,
             ):
                 self._surface_raw.blit(
-                    self._sub_widgets[i].surface,
+                    self._item(i).surface,
                     (0, (i - self._display_offset) * self._item_height),
                 )
         except:
@@ -280,3 +294,101 @@ class Table(Widget):
                 )
             for text, pos in self._text:
                 self._surface.blit(text, pos)
+
+
+class PagedTable(Table):
+    """The table of the rows fetched a page at a time around the rows shown,
+    for the lists too long to be held at once.
+
+    Subclasses tell the number of the rows by set_item_count, and fetch them 
+    by _fetch. Only the rows of the current page are made into items.
+    """
+
+    def __init__(
+        self,
+        parent: Widget,
+        rect: pygame.Rect,
+        surface: pygame.Surface = None,
+        present_number: int = 4,
+        page_size: int = TABLE_PAGE_SIZE,
+    ) -> None:
+        self._count = 0
+        self._page_size = max(page_size, 2 * present_number)
+        self._page_start = 0
+        self._rows = []
+        super().__init__(parent, rect, surface, [], present_number)
+
+    def _fetch(self, offset: int, limit: int) -> List[Any]:
+        """Fetch the rows from the offset, at most limit of them."""
+        return []
+
+    def _row_text(self, row: Any) -> List[str]:
+        """The text of the item of the row."""
+        return [str(row)]
+
+    def set_item_count(self, count: int) -> None:
+        """Set the number of the rows, and fetch them again when shown.
+
+        The active item and the rows shown are kept as far as possible.
+        """
+        self._count = count
+        self._rows = []
+        self._sub_widgets = []
+        self._page_start = 0
+        if count == 0:
+            self._active_item = None
+            self._display_offset = 0
+        else:
+            self._active_item = min(self._active_item or 0, count - 1)
+            self._display_offset = max(
+                min(self._display_offset, count - self._present_number), 0
+            )
+
+    def set_text_list(self, text_list: List[List[str]] = []) -> None:
+        self._active_item = None
+        self._display_offset = 0
+        self.set_item_count(0)
+
+    def row(self, index: int) -> Any:
+        """The row of the index, fetched if not in the current page."""
+        self._load(index)
+        return self._rows[index - self._page_start]
+
+    def _load(self, index: int) -> None:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        if 0 <= index - self._page_start < len(self._rows):
+            return
+        # The page is centred on the index, so that scrolling either way
+        # stays within it for a while.
+        self._page_start = max(index - self._page_size // 2, 0)
+        self._rows = self._fetch(self._page_start, self._page_size)
+        self._sub_widgets = []
+        for i, row in enumerate(self._rows):
+            item = self._make_item(self._row_text(row))
+            if self._page_start + i == self._active_item:
+                item.activate = True
+            self._sub_widgets.append(item)
+        if not 0 <= index - self._page_start < len(self._rows):
+            raise IndexError(index)
+
+    def _item_count(self) -> int:
+        return self._count
+
+    def _draw_begin(self) -> None:
+        # Fetched before the items are drawn.
+        if self._count > 0:
+            self._load(self._display_offset)
+        super()._draw_begin()
+
+    def _item(self, index: int) -> Table.Item:
+        self._load(index)
+        return self._sub_widgets[index - self._page_start]
+
+    def _set_active_item(self, index: int) -> None:
+        # The item of the former active row may not be in the page any more.
+        former = self._active_item - self._page_start
+        if 0 <= former < len(self._rows):
+            self._sub_widgets[former].activate = False
+        self._active_item = index
+        self._item(index).activate = True
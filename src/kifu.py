@@ -0,0 +1,92 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: src/kifu.py
+Description: 
+    The binary encoding of the kifu, which is how the games are stored in the
+    database.
+
+    An encoded kifu is a header of 3 bytes, the version and the width and 
+    the height of the board, followed by one cell a move. The cell of the 
+    move (column, row) is column * height + row, one unsigned byte if the 
+    board has at most 256 cells, otherwise two bytes in little endian.
+"""
+from typing import List, Tuple
+import numpy as np
+
+KIFU_VERSION = 1
+HEADER_SIZE = 3
+
+
+def cell_dtype(board_size: Tuple[int, int]) -> np.dtype:
+    """The type of a cell of the board in the encoding."""
+    return np.dtype("u1" if board_size[0] * board_size[1] <= 256 else "<u2")
+
+
+def encode_kifu(
+    board_size: Tuple[int, int], kifu: List[Tuple[int, int]]
+) -> bytes:
+    """Encode the kifu.
+
+    Args:
+        board_size (Tuple[int, int]): The size of the board, at most 255x255.
+        kifu (List[Tuple[int, int]]): The moves of the game.
+
+    Returns:
+        bytes: The encoded kifu.
+    """
+    width, height = board_size
+    assert 0 < width < 256 and 0 < height < 256
+    cells = np.array(
+        [column * height + row for column, row in kifu],
+        dtype=cell_dtype(board_size),
+    )
+    return bytes((KIFU_VERSION, width, height)) + cells.tobytes()
+
+
+def decode_cells(data: bytes) -> Tuple[Tuple[int, int], np.ndarray]:
+    """Decode the kifu into the cells of the moves, without copying them.
+
+    Args:
+        data (bytes): The encoded kifu.
+
+    Returns:
+        Tuple[Tuple[int, int], np.ndarray]: 
+            The size of the board, and the read-only array of the cells, a 
+            view into the data.
+    """
+    version, width, height = data[:HEADER_SIZE]
+    if version != KIFU_VERSION:
+        raise ValueError("Unknown kifu version %d" % version)
+    cells = np.frombuffer(
+        data, dtype=cell_dtype((width, height)), offset=HEADER_SIZE
+    )
+    return (width, height), cells
+
+
+def decode_kifu(data: bytes) -> Tuple[Tuple[int, int], List[Tuple[int, int]]]:
+    """Decode the kifu.
+
+    Args:
+        data (bytes): The encoded kifu.
+
+    Returns:
+        Tuple[Tuple[int, int], List[Tuple[int, int]]]: 
+            The size of the board and the moves of the game.
+    """
+    board_size, cells = decode_cells(data)
+    columns, rows = np.divmod(cells, board_size[1])
+    return board_size, list(zip(columns.tolist(), rows.tolist()))
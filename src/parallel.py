@@ -0,0 +1,296 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: src/parallel.py
+Description: 
+    The parallel search, which splits the root of the alpha-beta search or of
+    the Monte Carlo tree search over a pool of worker processes, so that the 
+    robot is not held to one core by the GIL.
+"""
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from multiprocessing.managers import SyncManager
+from typing import List, Tuple
+import multiprocessing
+import os
+import threading
+import time
+
+from src.constants import AI_STOP_POLL, AI_WORKERS
+from src.ai import MCTS, WIN_SCORE, AlphaBeta, SearchController, SearchResult
+from src.book import get_book
+from src.core import Board
+from src.threat import ThreatSolver
+
+_pool = None
+_manager = None
+
+
+def workers() -> int:
+    """The number of the worker processes.
+
+    Returns:
+        int: AI_WORKERS, or the number of the cores if it is None.
+    """
+    if AI_WORKERS != None:
+        return AI_WORKERS
+    return os.cpu_count() or 1
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The pool of the worker processes, started on the first call."""
+    global _pool
+    if _pool == None:
+        _pool = ProcessPoolExecutor(workers())
+    return _pool
+
+
+def get_manager() -> SyncManager:
+    """The manager process of the stop flags shared with the workers, started
+    on the first call."""
+    global _manager
+    if _manager == None:
+        _manager = multiprocessing.Manager()
+    return _manager
+
+
+def shutdown() -> None:
+    """Stop the worker processes, a later search starts them again."""
+    global _pool, _manager
+    if _pool != None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+    if _manager != None:
+        _manager.shutdown()
+        _manager = None
+
+
+class _SharedEvent:
+    """The stop flag of a search seen from a worker.
+
+    Every look at the shared event is a round trip to the manager process, 
+    so it is looked at once every AI_STOP_POLL seconds at most, while the 
+    search asks for it at every node.
+    """
+
+    def __init__(self, event: threading.Event) -> None:
+        self._event = event
+        self._set = False
+        self._next_poll = 0
+
+    def set(self) -> None:
+        self._event.set()
+
+    def is_set(self) -> bool:
+        now = time.perf_counter()
+        if not self._set and now >= self._next_poll:
+            self._set = self._event.is_set()
+            self._next_poll = now + AI_STOP_POLL
+        return self._set
+
+
+# The tasks run in the workers. Only the board size and the kifu are sent,
+# and plain tuples of moves and scores come back. A task stops early once
+# the shared stop event, if any, is set.
+
+
+def _replay(board_size: Tuple[int, int], kifu: List[Tuple[int, int]]):
+    board = Board(board_size)
+    for move in kifu:
+        board.place(*move)
+    return board
+
+
+def _alpha_beta_task(
+    board_size, kifu, moves, time_limit_ms, max_depth, limits, stop_event
+):
+    board = _replay(board_size, kifu)
+    controller = None
+    if stop_event != None:
+        controller = SearchController(*limits, _SharedEvent(stop_event))
+    result = AlphaBeta(
+        board, time_limit_ms, max_depth, root_moves=moves, controller=controller
+    ).run()
+    return result.move, result.score, result.depth, result.pv, result.nodes
+
+
+def _threat_task(board_size, kifu, time_limit_ms, stop_event):
+    solver = ThreatSolver(
+        _replay(board_size, kifu),
+        time_limit_ms=time_limit_ms,
+        stop_event=None if stop_event == None else _SharedEvent(stop_event),
+    )
+    return solver.solve(), solver.nodes
+
+
+def _mcts_task(board_size, kifu, time_limit_ms, playouts):
+    engine = MCTS(playouts)
+    engine.search(_replay(board_size, kifu), time_limit_ms)
+    return engine.root_statistics(), engine.playouts
+
+
+def search(
+    board: Board,
+    time_limit_ms: float = None,
+    max_depth: int = None,
+    controller: SearchController = None,
+) -> SearchResult:
+    """The alpha-beta search with the root moves split over the workers.
+
+    Each worker searches a share of the root moves of AlphaBeta by itself, 
+    while one more runs the threat solver, and the best score wins. The 
+    search stays in this process if there is only one worker or one move,
+    and is skipped for a position of the opening book.
+
+    Args:
+        board (Board): The position to search.
+        time_limit_ms (float, optional): 
+            The time budget in milliseconds. Defaults to no limit.
+        max_depth (int, optional): 
+            The deepest iteration. Defaults to AI_MAX_DEPTH.
+        controller (SearchController, optional): 
+            The time management and the stop flag, which replaces 
+            `time_limit_ms`. Once stopped, the workers are stopped through
+            an event shared with them, and the best of their results is 
+            returned as soon as they are done. Defaults to None.
+
+    Returns:
+        SearchResult: The best move, its principal variation and statistics.
+    """
+    move = get_book().best_move(board)
+    if move != None:
+        return SearchResult(move, 0, 0, [move], 0, 0)
+    moves = AlphaBeta(board, max_depth=max_depth).root_moves()
+    count = min(workers() - 1, len(moves))
+    if count < 1 or len(moves) == 1:
+        return AlphaBeta(
+            board, time_limit_ms, max_depth, controller=controller
+        ).run()
+
+    stop_event, limits = None, None
+    if controller != None:
+        controller.start()
+        time_limit_ms = controller.time_limit_ms
+        controller.update(SearchResult(moves[0], 0, 0, [moves[0]], 0, 0))
+        stop_event = get_manager().Event()
+        limits = (controller.time_limit_ms, controller.hard_limit_ms)
+
+    start = time.perf_counter()
+    pool = get_pool()
+    size, kifu = board.board_size, board.kifu_copy
+    solver = pool.submit(_threat_task, size, kifu, time_limit_ms, stop_event)
+    tasks = [
+        pool.submit(
+            _alpha_beta_task,
+            size,
+            kifu,
+            moves[i::count],
+            time_limit_ms,
+            max_depth,
+            limits,
+            stop_event,
+        )
+        for i in range(count)
+    ]
+    pending = [solver] + tasks
+    while len(pending) > 0:
+        if controller != None and controller.stopped:
+            # cancel() only drops the tasks not started yet, the running ones
+            # see the event within AI_STOP_POLL and return their deepest
+            # completed iteration, so that the wait is short.
+            stop_event.set()
+            for task in pending:
+                task.cancel()
+            wait(pending)
+            break
+        pending = wait(pending, 0.01, FIRST_EXCEPTION).not_done
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    sequence, nodes = None, 0
+    if not solver.cancelled():
+        sequence, nodes = solver.result()
+    results = [task.result() for task in tasks if not task.cancelled()]
+    nodes += sum(result[4] for result in results)
+    if sequence != None:
+        return SearchResult(
+            sequence[0],
+            WIN_SCORE - len(sequence) + 1,
+            len(sequence),
+            sequence,
+            nodes,
+            nodes / elapsed,
+        )
+    # A share stopped before its first iteration only has a guess.
+    searched = [result for result in results if result[2] > 0]
+    if len(searched) == 0 and controller != None:
+        return controller.best
+    # The first share holds the most promising move, which wins the tie.
+    move, score, depth, pv, _ = max(
+        searched or results, key=lambda result: result[1]
+    )
+    return SearchResult(move, score, depth, pv, nodes, nodes / elapsed)
+
+
+def search_mcts(
+    board: Board, time_limit_ms: float = None, playouts: int = None
+) -> SearchResult:
+    """The Monte Carlo tree search with a tree in every worker.
+
+    The trees are grown independently from the same position and the visits
+    of their root moves are summed up.
+
+    Args:
+        board (Board): The position to search.
+        time_limit_ms (float, optional): 
+            The time budget in milliseconds. Defaults to no limit.
+        playouts (int, optional): 
+            The most playouts in total, split over the workers. As a tree 
+            needs one playout at least, fewer playouts than workers only keep
+            as many workers busy. Defaults to AI_MCTS_PLAYOUTS for each 
+            worker.
+
+    Returns:
+        SearchResult: 
+            The most visited move with its win rate, and the playouts of all
+            the workers, see MCTS.search.
+    """
+    count = workers()
+    shares = [None] * count
+    if playouts != None:
+        count = max(min(count, playouts), 1)
+        shares = [
+            playouts // count + (i < playouts % count) for i in range(count)
+        ]
+    start = time.perf_counter()
+    pool = get_pool()
+    size, kifu = board.board_size, board.kifu_copy
+    tasks = [
+        pool.submit(_mcts_task, size, kifu, time_limit_ms, share)
+        for share in shares
+    ]
+    wait(tasks)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    visits, wins, total = {}, {}, 0
+    for task in tasks:
+        statistics, task_playouts = task.result()
+        total += task_playouts
+        for move, move_visits, move_wins in statistics:
+            visits[move] = visits.get(move, 0) + move_visits
+            wins[move] = wins.get(move, 0) + move_wins
+    move = max(visits, key=visits.get)
+    return SearchResult(
+        move, wins[move] / visits[move], 1, [move], total, total / elapsed
+    )
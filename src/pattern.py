@@ -0,0 +1,184 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: src/pattern.py
+Description:
+    The precomputed pattern tables, which grade a line through a position by
+    one lookup of the pattern code of its neighbours.
+
+    The pattern code of a position along a direction packs the WINDOW cells
+    before and after it, 2 bits a cell: 0 for blank, 1 for black, 2 for white
+    and 3 for outside the board. The cell `step` (-WINDOW to WINDOW except 0)
+    lines away takes the bits of weight OFFSETS[i][1], where OFFSETS[i][0] is
+    `step`. The position itself is not in the code.
+"""
+from typing import Iterable
+import numpy as np
+
+WINDOW = 4  # Cells on each side, enough to tell a five and its space.
+BLANK, BLACK, WHITE, EDGE = 0, 1, 2, 3  # The values of one cell.
+NO_THREAT, OPEN_THREE, FOUR, OPEN_FOUR, FIVE = 0, 1, 2, 3, 4  # Threat levels.
+
+# (step, weight) of every cell in the code, from the farthest one before the
+# position to the farthest one after it.
+OFFSETS = tuple(
+    (step, 4 ** (step + WINDOW if step < 0 else step + WINDOW - 1))
+    for step in list(range(-WINDOW, 0)) + list(range(1, WINDOW + 1))
+)
+PATTERN_COUNT = 4 ** (2 * WINDOW)
+
+
+def pattern_code(cells: Iterable[int]) -> int:
+    """Pack the cells into a pattern code.
+
+    Args:
+        cells (Iterable[int]):
+            The 2 * WINDOW cell values in the order of OFFSETS.
+
+    Returns:
+        int: The pattern code.
+    """
+    code = 0
+    for (_, weight), cell in zip(OFFSETS, cells):
+        code += cell * weight
+    return code
+
+
+def _build_tables():
+    """Grade every pattern code for both sides, as BoardAI.count did.
+
+    For a blank position and one side, count1 is the run of the side through
+    the position, count2 is the run together with the blank cells following
+    both of its ends, and wall tells if the run is blocked by an opponent
+    piece. A window of WINDOW cells decides all of them as far as the grades
+    can tell, since the grades only compare the counts with 5.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The grade and the five tables.
+    """
+    codes = np.arange(PATTERN_COUNT)
+    cells = codes[:, None] >> 2 * np.arange(2 * WINDOW) & 3
+    # Both halves ordered from the position outwards.
+    halves = (cells[:, WINDOW - 1 :: -1], cells[:, WINDOW:])
+    grades = np.zeros((2, PATTERN_COUNT))
+    fives = np.zeros((2, PATTERN_COUNT), dtype=bool)
+    for side in (0, 1):
+        mine, theirs = BLACK + side, WHITE - side
+        count1 = np.ones(PATTERN_COUNT, dtype=int)
+        count2 = np.ones(PATTERN_COUNT, dtype=int)
+        wall = np.zeros(PATTERN_COUNT, dtype=bool)
+        for half in halves:
+            run = np.cumprod(half == mine, axis=1).sum(axis=1)
+            beyond = np.where(
+                run < WINDOW,
+                half[codes, np.minimum(run, WINDOW - 1)],
+                EDGE,
+            )
+            wall |= (run > 0) & (beyond == theirs)
+            blank = np.zeros(PATTERN_COUNT, dtype=int)
+            alive = np.ones(PATTERN_COUNT, dtype=bool)
+            for i in range(WINDOW):
+                alive &= (i < run) | (half[:, i] == BLANK)
+                blank += alive & (i >= run)
+            count1 += run
+            count2 += run + blank
+
+        grade = np.zeros(PATTERN_COUNT)
+        opened = count2 >= 5
+        for count, open_grade, closed_grade in (
+            (4, 1600, 20),
+            (3, 400, 10),
+            (2, 100, 4),
+            (1, 10, 1),
+        ):
+            grade[(count1 == count) & opened] = open_grade
+            grade[(count1 == count) & ~opened] = closed_grade
+        grade[wall] *= 0.3
+        grade[count1 >= 5] = 100000
+        grades[side] = grade
+        fives[side] = count1 >= 5
+    return grades, fives
+
+
+def _build_five_points():
+    """The five points of every line of 2 * WINDOW + 1 cells.
+
+    Returns:
+        ndarray: 
+            points[mine, blank] is the bit mask of the blank cells completing
+            a five with the centre, where mine and blank are the bit masks of 
+            the cells of the side and the blank cells of the line.
+    """
+    size = 1 << 2 * WINDOW + 1
+    mine, blank = np.indices((size, size))
+    points = np.zeros((size, size), dtype=int)
+    for start in range(WINDOW + 1):
+        segment = 0b11111 << start
+        gap = blank & segment
+        hit = (mine | blank) & segment == segment
+        hit &= (gap != 0) & (gap & gap - 1 == 0)  # Exactly one blank cell.
+        points |= np.where(hit, gap, 0)
+    return points
+
+
+def _build_threat_table():
+    """Classify the threat made by placing on the position for both sides.
+
+    Only the fives through the position count, so the window tells all. A 
+    four leaves one five point on the line, an open four leaves two or more,
+    and an open three leaves a blank cell turning it into an open four.
+
+    Returns:
+        ndarray: The threat table.
+    """
+    five_points = _build_five_points()
+    bit_count = np.array([bin(i).count("1") for i in range(len(five_points))])
+    cells = np.arange(PATTERN_COUNT)[:, None] >> 2 * np.arange(2 * WINDOW) & 3
+    bits = 1 << np.delete(np.arange(2 * WINDOW + 1), WINDOW)
+    blank = (bits * (cells == BLANK)).sum(axis=1)
+    threats = np.zeros((2, PATTERN_COUNT), dtype=np.int8)
+    for side in (0, 1):
+        mine = (bits * (cells == BLACK + side)).sum(axis=1) | 1 << WINDOW
+        fours = bit_count[five_points[mine, blank]]
+        three = np.zeros(PATTERN_COUNT, dtype=bool)
+        for bit in bits:
+            filled = blank & bit != 0
+            three |= filled & (
+                bit_count[five_points[mine | bit, blank & ~bit]] >= 2
+            )
+        threat = np.where(three, OPEN_THREE, NO_THREAT)
+        threat[fours == 1] = FOUR
+        threat[fours >= 2] = OPEN_FOUR
+        threat[FIVE_TABLE[side]] = FIVE
+        threats[side] = threat
+    return threats
+
+
+# GRADE_TABLE[side][code] is the grade of the line for the side placing on the
+# position, 100000 for a five. FIVE_TABLE[side][code] tells if the place makes
+# a five. GRADES and FIVES are the same tables as nested lists, which are
+# faster to read one entry at a time.
+GRADE_TABLE, FIVE_TABLE = _build_tables()
+GRADE_TABLE.flags.writeable = False
+FIVE_TABLE.flags.writeable = False
+GRADES = GRADE_TABLE.tolist()
+FIVES = FIVE_TABLE.tolist()
+
+# THREAT_TABLE[side][code] is the threat level (NO_THREAT to FIVE) along the
+# line made by the side placing on the position, THREATS is its nested list.
+THREAT_TABLE = _build_threat_table()
+THREAT_TABLE.flags.writeable = False
+THREATS = THREAT_TABLE.tolist()
@@ -24,6 +24,7 @@ from random import choice
 
 import src.constants
 import src.ai
+import src.parallel
 from src.core import Board
 
 
@@ -52,6 +53,11 @@ class Player:
     def place_a_piece(self) -> None:
         self.board.place(*self.get_move())
 
+    def stop(self) -> None:
+        """Stop thinking of the move, if the player is, as it is no longer
+        wanted. Safe to call from any thread."""
+        pass
+
 
 class MonkeyPlayer(Player):
     """🐵: A cute monkey player, you will like it :)"""
@@ -65,10 +71,82 @@ class MonkeyPlayer(Player):
 class RobotPlayer(Player):
     """🤖: A cute robot player. Smarter than monkey :)"""
 
+    # Whether to search on the opponent's time, and the ponderer shared by the
+    # players created move by move.
+    pondering = False
+    _ponderer = None
+
+    def __init__(self, playing_board: Board) -> None:
+        super().__init__(playing_board)
+        self._controller = None
+        self._stopped = False
+
+    def get_move(self) -> Tuple[int, int]:
+        result = None
+        if RobotPlayer._ponderer != None:
+            RobotPlayer._ponderer.stop()
+            result = RobotPlayer._ponderer.result(self.board)
+        if result == None:
+            controller = src.ai.SearchController()
+            self._controller = controller
+            if self._stopped:
+                controller.stop()
+            result = src.parallel.search(self.board, controller=controller)
+        if self.pondering and not self._stopped:
+            self._ponder(result.move)
+        return result.move
+
+    def _ponder(self, move: Tuple[int, int]) -> None:
+        """Start pondering the position after the move."""
+        if RobotPlayer._ponderer == None:
+            searcher = None
+            if src.parallel.workers() > 1:
+                searcher = src.parallel.search
+            RobotPlayer._ponderer = src.ai.Ponderer(searcher=searcher)
+        board = Board(self.board.board_size)
+        for x in self.board.kifu_copy + [move]:
+            board.place(*x)
+        RobotPlayer._ponderer.start(board)
+
+    @staticmethod
+    def stop_pondering() -> None:
+        """Stop pondering, as the game is over or left, without waiting for
+        the search, as it is called on the UI thread."""
+        if RobotPlayer._ponderer != None:
+            RobotPlayer._ponderer.stop(wait=False)
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._controller != None:
+            self._controller.stop()
+
+
+class GreedyRobotPlayer(Player):
+    """🤖: The robot of the old days, which only looks one move ahead."""
+
     def get_move(self) -> Tuple[int, int]:
         return src.ai.get_move(self.board)
 
 
+class MCTSPlayer(Player):
+    """🎲: A robot rolling the dice, thousands of games in its head."""
+
+    # Shared by the players created move by move, so that the tree is reused.
+    _engine = None
+
+    def get_move(self) -> Tuple[int, int]:
+        if src.parallel.workers() > 1:
+            # A tree in every worker, which outgrows the reused tree.
+            return src.parallel.search_mcts(
+                self.board, src.constants.AI_TIME_LIMIT
+            ).move
+        if MCTSPlayer._engine == None:
+            MCTSPlayer._engine = src.ai.MCTS()
+        return MCTSPlayer._engine.search(
+            self.board, src.constants.AI_TIME_LIMIT
+        ).move
+
+
 class HumanPlayer(Player):
     """😉: A cute human player. Smarter than robot, probably :)"""
 
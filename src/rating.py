@@ -0,0 +1,193 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: src/rating.py
+Description: 
+    The ratings of the players, by the Elo system and by the Glicko-2 system,
+    updated game by game.
+"""
+from typing import NamedTuple, Tuple
+import math
+
+from src.constants import (
+    RATING_ELO_K,
+    RATING_INITIAL,
+    RATING_INITIAL_RD,
+    RATING_INITIAL_VOLATILITY,
+    RATING_TAU,
+)
+
+GLICKO_SCALE = 173.7178  # Between the Glicko and the Glicko-2 scales.
+
+
+class Rating(NamedTuple):
+    """The rating of a player.
+
+    Attributes:
+        elo: The Elo rating.
+        glicko: The Glicko-2 rating, on the Glicko scale.
+        rd: The rating deviation of the Glicko-2 rating.
+        volatility: The volatility of the Glicko-2 rating.
+        games: The rated games.
+        score: The wins minus the losses.
+    """
+
+    elo: float = RATING_INITIAL
+    glicko: float = RATING_INITIAL
+    rd: float = RATING_INITIAL_RD
+    volatility: float = RATING_INITIAL_VOLATILITY
+    games: int = 0
+    score: int = 0
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    """The expected score of the Elo rating against the opponent."""
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+def elo_update(
+    rating: float, opponent: float, score: float, k: float = None
+) -> float:
+    """The Elo rating after a game.
+
+    Args:
+        rating (float): The rating of the player.
+        opponent (float): The rating of the opponent.
+        score (float): 1 for a win, 0.5 for a draw and 0 for a loss.
+        k (float, optional): The K-factor. Defaults to RATING_ELO_K.
+
+    Returns:
+        float: The new rating.
+    """
+    if k == None:
+        k = RATING_ELO_K
+    return rating + k * (score - expected_score(rating, opponent))
+
+
+def glicko2_update(
+    rating: float,
+    rd: float,
+    volatility: float,
+    opponent: float,
+    opponent_rd: float,
+    score: float,
+    tau: float = None,
+) -> Tuple[float, float, float]:
+    """The Glicko-2 rating after a game, which is a rating period of its own.
+
+    See Glickman, "Example of the Glicko-2 system", for the steps.
+
+    Args:
+        rating (float): The rating of the player, on the Glicko scale.
+        rd (float): The rating deviation of the player.
+        volatility (float): The volatility of the player.
+        opponent (float): The rating of the opponent.
+        opponent_rd (float): The rating deviation of the opponent.
+        score (float): 1 for a win, 0.5 for a draw and 0 for a loss.
+        tau (float, optional): 
+            The constraint on the change of the volatility. Defaults to 
+            RATING_TAU.
+
+    Returns:
+        Tuple[float, float, float]: The new rating, deviation and volatility.
+    """
+    if tau == None:
+        tau = RATING_TAU
+    mu = (rating - RATING_INITIAL) / GLICKO_SCALE
+    phi = rd / GLICKO_SCALE
+    opponent_mu = (opponent - RATING_INITIAL) / GLICKO_SCALE
+    opponent_phi = opponent_rd / GLICKO_SCALE
+
+    g = 1 / math.sqrt(1 + 3 * opponent_phi**2 / math.pi**2)
+    expected = 1 / (1 + math.exp(-g * (mu - opponent_mu)))
+    variance = 1 / (g**2 * expected * (1 - expected))
+    delta = variance * g * (score - expected)
+
+    # The new volatility, by the Illinois algorithm.
+    a = math.log(volatility**2)
+
+    def f(x):
+        ex = math.exp(x)
+        numerator = ex * (delta**2 - phi**2 - variance - ex)
+        denominator = 2 * (phi**2 + variance + ex) ** 2
+        return numerator / denominator - (x - a) / tau**2
+
+    low = a
+    if delta**2 > phi**2 + variance:
+        high = math.log(delta**2 - phi**2 - variance)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        high = a - k * tau
+    f_low, f_high = f(low), f(high)
+    while abs(high - low) > 1e-6:
+        middle = low + (low - high) * f_low / (f_high - f_low)
+        f_middle = f(middle)
+        if f_middle * f_high <= 0:
+            low, f_low = high, f_high
+        else:
+            f_low /= 2
+        high, f_high = middle, f_middle
+    volatility = math.exp(low / 2)
+
+    phi = 1 / math.sqrt(1 / (phi**2 + volatility**2) + 1 / variance)
+    mu += phi**2 * g * (score - expected)
+    return (
+        mu * GLICKO_SCALE + RATING_INITIAL,
+        phi * GLICKO_SCALE,
+        volatility,
+    )
+
+
+def rate_game(
+    black: Rating, white: Rating, winner: int
+) -> Tuple[Rating, Rating]:
+    """The ratings of both players after a game between them.
+
+    Args:
+        black (Rating): The rating of the black player.
+        white (Rating): The rating of the white player.
+        winner (int): 0 for black, 1 for white, None for a draw.
+
+    Returns:
+        Tuple[Rating, Rating]: The new ratings of black and white.
+    """
+    score = 0.5 if winner == None else float(winner == 0)
+    ratings = []
+    for player, opponent, player_score in (
+        (black, white, score),
+        (white, black, 1 - score),
+    ):
+        glicko, rd, volatility = glicko2_update(
+            player.glicko,
+            player.rd,
+            player.volatility,
+            opponent.glicko,
+            opponent.rd,
+            player_score,
+        )
+        ratings.append(
+            Rating(
+                elo_update(player.elo, opponent.elo, player_score),
+                glicko,
+                rd,
+                volatility,
+                player.games + 1,
+                player.score + round(2 * player_score - 1),
+            )
+        )
+    return tuple(ratings)
@@ -0,0 +1,422 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: src/records.py
+Description: 
+    The import and the export of the games in text formats, which stream the
+    games one by one, so that an archive of any size takes constant memory.
+
+    jsonl: 
+        One JSON object a line, with the timestamp, black, white, size (the 
+        width and the height), moves (the columns and the rows from 0) and
+        winner (0, 1 or null) of a game.
+    psq: 
+        The Piskvork / Gomocup record, "Piskvorky WxH, X:Y, 0" followed by
+        one "column,row,time" line a move, from 1, then the names of the 
+        players and "-1". The games of an archive follow one another.
+"""
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    TextIO,
+    Tuple,
+)
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+import src.constants
+from src.book import build_book
+from src.constants import DATABASE_BATCH_SIZE
+from src.core import BitBoard
+from src.database import BoardDatabase, KifuRecord
+
+PSQ_HEADER = re.compile(r"Piskvorky (\d+)x(\d+)")
+
+
+class RecordError(ValueError):
+    """A bad record of a file, which cannot be read, has an illegal move or
+    is already in the database.
+
+    Attributes:
+        line: The line of the file where the record starts, from 1.
+    """
+
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__("line %d: %s" % (line, message))
+        self.line = line
+
+
+class ImportResult(NamedTuple):
+    """The games of an import.
+
+    Attributes:
+        imported: The number of the games written to the database.
+        skipped: The number of the bad records skipped, see RecordError.
+    """
+
+    imported: int
+    skipped: int
+
+
+def _fail(error: RecordError, on_error: Callable[[RecordError], None]):
+    """Raise the error, or pass it to on_error to skip the record."""
+    if on_error == None:
+        raise error
+    on_error(error)
+
+
+def _replay(
+    board_size: Tuple[int, int],
+    kifu: Iterable[Tuple[int, int]],
+    black: str,
+    white: str,
+) -> BitBoard:
+    """Replay the game on a new board, which also finds the winner.
+
+    BitBoard replays a game many times faster than Board, and is saved to 
+    the database the same way.
+
+    Raises:
+        ValueError: If the board size or any move is not legal.
+    """
+    width, height = (int(x) for x in board_size)
+    if not (0 < width < 256 and 0 < height < 256):
+        raise ValueError("board size %dx%d out of range" % (width, height))
+    board = BitBoard((width, height), black, white)
+    for ply, (column, row) in enumerate(kifu, 1):
+        move = (int(column), int(row))
+        if board.winner != None:
+            raise ValueError("move %d after the five" % ply)
+        if move not in board.available_place:
+            raise ValueError("move %d to %s is not available" % (ply, move))
+        board.place(*move)
+    board.timestamp = None
+    return board
+
+
+def read_jsonl(
+    file: TextIO, on_error: Callable[[RecordError], None] = None
+) -> Iterator[Tuple[int, BitBoard]]:
+    """Read the games of the jsonl format, see the description of the module.
+
+    Args:
+        file (TextIO): The text file.
+        on_error (Callable[[RecordError], None], optional): 
+            Called with the error of every bad record, which is skipped. 
+            Defaults to raising the error.
+
+    Yields:
+        Tuple[int, BitBoard]: 
+            The line of every game, and the game, whose timestamp is None if
+            it is not in the record.
+    """
+    for number, line in enumerate(file, 1):
+        if line.strip() == "":
+            continue
+        try:
+            record = json.loads(line)
+            board = _replay(
+                record["size"],
+                record["moves"],
+                str(record.get("black", "")),
+                str(record.get("white", "")),
+            )
+        except (ValueError, KeyError, TypeError) as error:
+            message = "%s: %s" % (type(error).__name__, error)
+            _fail(RecordError(number, message), on_error)
+            continue
+        if record.get("timestamp") != None:
+            board.timestamp = str(record["timestamp"])
+        yield number, board
+
+
+def write_jsonl(games: Iterable[KifuRecord], file: TextIO) -> int:
+    """Write the games in the jsonl format.
+
+    Args:
+        games (Iterable[KifuRecord]): The games, or the boards.
+        file (TextIO): The text file.
+
+    Returns:
+        int: The number of the games written.
+    """
+    count = 0
+    for game in games:
+        record = {
+            "timestamp": game.timestamp,
+            "black": game.competitor_black,
+            "white": game.competitor_white,
+            "size": list(game.board_size),
+            "moves": [list(move) for move in game.kifu],
+            "winner": game.winner,
+        }
+        file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        count += 1
+    return count
+
+
+def read_psq(
+    file: TextIO, on_error: Callable[[RecordError], None] = None
+) -> Iterator[Tuple[int, BitBoard]]:
+    """Read the games of the psq format, see the description of the module.
+
+    The lines after the moves are the names of black and white, if any, and
+    the lines after them up to the next game are skipped.
+
+    Args:
+        file (TextIO): The text file.
+        on_error (Callable[[RecordError], None], optional): 
+            Called with the error of every bad game, which is skipped. 
+            Defaults to raising the error.
+
+    Yields:
+        Tuple[int, BitBoard]: 
+            The line of the header of every game, and the game, whose 
+            timestamp is None.
+    """
+    game = None  # The line of the header, the board size, the kifu, names
+
+    def replay():
+        start, board_size, kifu, names = game
+        try:
+            return _replay(board_size, kifu, *(names + ["", ""])[:2])
+        except ValueError as error:
+            _fail(RecordError(start, str(error)), on_error)
+
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        header = PSQ_HEADER.match(line)
+        if header != None:
+            board = None if game == None else replay()
+            if board != None:
+                yield game[0], board
+            game = (number, header.groups(), [], [])
+        elif game == None or line == "":
+            continue
+        elif len(game[3]) == 0 and re.fullmatch(r"\d+,\d+(,-?\d+)?", line):
+            column, row = line.split(",")[:2]
+            game[2].append((int(column) - 1, int(row) - 1))
+        elif not re.fullmatch(r"-?\d+", line):
+            game[3].append(line)
+    board = None if game == None else replay()
+    if board != None:
+        yield game[0], board
+
+
+def write_psq(games: Iterable[KifuRecord], file: TextIO) -> int:
+    """Write the games in the psq format, one after another.
+
+    Args:
+        games (Iterable[KifuRecord]): The games, or the boards.
+        file (TextIO): The text file.
+
+    Returns:
+        int: The number of the games written.
+    """
+    count = 0
+    for game in games:
+        width, height = game.board_size
+        lines = ["Piskvorky %dx%d, 11:11, 0" % (width, height)]
+        lines += ["%d,%d,0" % (c + 1, r + 1) for c, r in game.kifu]
+        lines += [game.competitor_black, game.competitor_white, "-1"]
+        file.write("\n".join(lines) + "\n")
+        count += 1
+    return count
+
+
+# The formats by name: the reader and the writer.
+FORMATS: Dict[
+    str,
+    Tuple[
+        Callable[
+            [TextIO, Callable[[RecordError], None]],
+            Iterator[Tuple[int, BitBoard]],
+        ],
+        Callable[[Iterable[KifuRecord], TextIO], int],
+    ],
+] = {
+    "jsonl": (read_jsonl, write_jsonl),
+    "psq": (read_psq, write_psq),
+}
+
+
+def guess_format(path: str) -> str:
+    """The format of the file told by its extension, such as games.psq.gz.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        str: The name of the format, see FORMATS.
+    """
+    root, extension = os.path.splitext(path)
+    if extension == ".gz":
+        extension = os.path.splitext(root)[1]
+    extension = {".json": ".jsonl", ".txt": ".psq"}.get(extension, extension)
+    if extension[1:] not in FORMATS:
+        raise ValueError("Unknown format of %s" % path)
+    return extension[1:]
+
+
+def open_text(path: str, mode: str = "r") -> TextIO:
+    """Open the text file, compressed by gzip if it ends with .gz.
+
+    Args:
+        path (str): The path to the file.
+        mode (str, optional): "r" or "w". Defaults to "r".
+
+    Returns:
+        TextIO: The file.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def import_games(
+    database: BoardDatabase,
+    path: str,
+    format: str = None,
+    on_error: Callable[[RecordError], None] = None,
+) -> ImportResult:
+    """Import the games of the file into the database.
+
+    The games are written DATABASE_BATCH_SIZE at a time, each batch in one 
+    transaction. A bad record is passed to on_error and skipped, or else 
+    raises its RecordError once the games before it are written, so that 
+    the file is imported up to the bad record and no further. The games 
+    without a timestamp are stamped with the time of the import and their 
+    number in the file.
+
+    Args:
+        database (BoardDatabase): The database.
+        path (str): The path to the file.
+        format (str, optional): 
+            The format, see FORMATS. Defaults to the one told by the path.
+        on_error (Callable[[RecordError], None], optional): 
+            Called with the error of every bad record, which is skipped. 
+            Defaults to raising the error.
+
+    Returns:
+        ImportResult: The numbers of the games imported and skipped.
+    """
+    read = FORMATS[format or guess_format(path)][0]
+    stamp = time.strftime(src.constants.TIME_FORMAT, time.localtime())
+    skipped = 0
+
+    def skip(error: RecordError) -> None:
+        nonlocal skipped
+        skipped += 1
+        on_error(error)
+
+    handler = None if on_error == None else skip
+    boards, timestamps, imported, count = [], set(), 0, 0
+    try:
+        with open_text(path) as file:
+            for line, board in read(file, handler):
+                count += 1
+                if board.timestamp == None:
+                    # Padded, so that the games sort in the order of the file.
+                    board.timestamp = "%s #%09d" % (stamp, count)
+                if board.timestamp in timestamps or database.exists(
+                    board.timestamp
+                ):
+                    message = "game %s is already imported" % board.timestamp
+                    _fail(RecordError(line, message), handler)
+                    continue
+                boards.append(board)
+                timestamps.add(board.timestamp)
+                if len(boards) >= DATABASE_BATCH_SIZE:
+                    imported += database.append_many(boards)
+                    boards, timestamps = [], set()
+    except RecordError:
+        database.append_many(boards)
+        raise
+    imported += database.append_many(boards)
+    return ImportResult(imported, skipped)
+
+
+def export_games(database: BoardDatabase, path: str, format: str = None) -> int:
+    """Export the games of the database into the file, one by one.
+
+    Args:
+        database (BoardDatabase): The database.
+        path (str): The path to the file, which is overwritten.
+        format (str, optional): 
+            The format, see FORMATS. Defaults to the one told by the path.
+
+    Returns:
+        int: The number of the games exported.
+    """
+    write = FORMATS[format or guess_format(path)][1]
+    with open_text(path, "w") as file:
+        return write(database.iter_kifu(), file)
+
+
+def main(argv: List[str] = None) -> None:
+    """The command line, see `python records.py --help`."""
+    parser = argparse.ArgumentParser(
+        description="Import or export the games of the database, or build "
+        "the opening book from them."
+    )
+    parser.add_argument("command", choices=("import", "export", "book"))
+    parser.add_argument(
+        "path",
+        nargs="?",
+        help="the file, compressed if it ends in .gz, or the book file",
+    )
+    parser.add_argument("-f", "--format", choices=FORMATS, default=None)
+    parser.add_argument(
+        "--skip-errors",
+        action="store_true",
+        help="skip the bad records of an import instead of stopping at them",
+    )
+    args = parser.parse_args(argv)
+    if args.path == None and args.command != "book":
+        parser.error("the path is required to %s" % args.command)
+
+    def report(error: RecordError) -> None:
+        print("%s: %s, skipped" % (args.path, error), file=sys.stderr)
+
+    on_error = report if args.skip_errors else None
+    database = BoardDatabase()
+    start = time.perf_counter()
+    if args.command == "book":
+        count = build_book(database.iter_boards(), args.path)
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print("built %d book records in %.1f s" % (count, elapsed))
+        return
+    if args.command == "import":
+        count, skipped = import_games(
+            database, args.path, args.format, on_error
+        )
+    else:
+        count, skipped = export_games(database, args.path, args.format), 0
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(
+        "%sed %d games, %.0f games/s" % (args.command, count, count / elapsed)
+    )
+    if skipped > 0:
+        print("skipped %d bad records" % skipped)
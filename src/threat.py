@@ -0,0 +1,281 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: src/threat.py
+Description: 
+    The threat-space solver, which searches the forced wins made only of 
+    fours (VCF, victory by continuous fours) or of fours and threes (VCT).
+"""
+from typing import List, Optional, Tuple
+import threading
+import time
+
+from src.constants import AI_THREAT_NODES, AI_VCF_DEPTH, AI_VCT_DEPTH
+from src.core import DIRECTIONS, Board
+from src.pattern import FIVE, FOUR, OFFSETS, OPEN_THREE, THREATS
+
+
+class _NodeLimit(Exception):
+    """Raised inside the solver once the node budget is used up."""
+
+
+class ThreatSolver:
+    """Depth-first threat-space search for the side to move.
+
+    The attacker only plays threats: fours, and open threes in VCT. The 
+    defender only tries the replies which may refute the threat, that is the
+    five points left by a four, the cells of the line of a three, and the 
+    fours of its own. A sequence is returned once every reply is refuted, so
+    that the win is forced, while a failure proves nothing.
+
+    Attributes:
+        nodes: The number of nodes searched.
+
+    Functions:
+        solve(): Search a VCF, then a VCT, and return the winning sequence.
+        solve_vcf(): Search a VCF only.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        node_limit: int = None,
+        vcf_depth: int = None,
+        vct_depth: int = None,
+        time_limit_ms: float = None,
+        stop_event: threading.Event = None,
+    ) -> None:
+        """Initialization to the solver.
+
+        Args:
+            board (Board): 
+                The position to solve, which is placed and cancelled during 
+                the search and left as it was.
+            node_limit (int, optional): 
+                The node budget shared by all the searches of the solver. 
+                Defaults to AI_THREAT_NODES.
+            vcf_depth (int, optional): 
+                The most attacking moves in a VCF. Defaults to AI_VCF_DEPTH.
+            vct_depth (int, optional): 
+                The most attacking moves in a VCT. Defaults to AI_VCT_DEPTH.
+            time_limit_ms (float, optional): 
+                The time budget in milliseconds, which starts with the first
+                search. Defaults to no limit.
+            stop_event (threading.Event, optional): 
+                The search gives up once it is set. Defaults to None.
+        """
+        self._board = board
+        self._node_limit = AI_THREAT_NODES if node_limit == None else node_limit
+        self._vcf_depth = AI_VCF_DEPTH if vcf_depth == None else vcf_depth
+        self._vct_depth = AI_VCT_DEPTH if vct_depth == None else vct_depth
+        self._time_limit_ms = time_limit_ms
+        self._deadline = None
+        self._stop_event = stop_event
+        self._attacker = int(board.current_side)
+        self._failed = {}  # (hash, threat) -> the deepest failed depth
+        self.nodes = 0
+
+    def solve(self) -> Optional[List[Tuple[int, int]]]:
+        """Search a VCF, then a VCT.
+
+        Returns:
+            NoneType or List[Tuple[int, int]]: 
+                The moves of both sides from the current position to the five
+                of the side to move, or None if no win is found.
+        """
+        sequence = self.solve_vcf()
+        if sequence == None:
+            sequence = self._solve(OPEN_THREE, self._vct_depth)
+        return sequence
+
+    def solve_vcf(self) -> Optional[List[Tuple[int, int]]]:
+        """Search a VCF, see solve."""
+        return self._solve(FOUR, self._vcf_depth)
+
+    def _solve(self, threat: int, depth: int) -> Optional[List[Tuple]]:
+        """Search the win by the threats of the level with iterative deepening.
+
+        Args:
+            threat (int): The lowest threat level the attacker may play.
+            depth (int): The most attacking moves.
+
+        Returns:
+            NoneType or List[Tuple[int, int]]: The winning sequence or None.
+        """
+        if self._board.winner != None:
+            return None
+        if self._deadline == None and self._time_limit_ms != None:
+            self._deadline = time.perf_counter() + self._time_limit_ms / 1000
+        try:
+            for limit in range(1, depth + 1):
+                sequence = self._attack(threat, limit)
+                if sequence != None:
+                    return sequence
+        except _NodeLimit:
+            pass
+        return None
+
+    def _count_node(self) -> None:
+        self.nodes += 1
+        if self.nodes > self._node_limit:
+            raise _NodeLimit()
+        if self._deadline != None and time.perf_counter() > self._deadline:
+            raise _NodeLimit()
+        if self._stop_event != None and self._stop_event.is_set():
+            raise _NodeLimit()
+
+    def _scan(self) -> List[Tuple[Tuple[int, int], List[int], List[int]]]:
+        """The threats of both sides on every candidate.
+
+        Every five point and four is next to a piece, so the candidates are
+        enough to find them.
+
+        Returns:
+            List[Tuple[Tuple[int, int], List[int], List[int]]]: 
+                The candidates in order, with the threat levels along each 
+                direction made by the attacker and by the defender placing on
+                them.
+        """
+        line_code = self._board.line_code
+        mine = THREATS[self._attacker]
+        theirs = THREATS[1 - self._attacker]
+        directions = range(len(DIRECTIONS))
+        scan = []
+        for move in sorted(self._board.candidates):
+            codes = [line_code(move[0], move[1], d) for d in directions]
+            scan.append(
+                (move, [mine[x] for x in codes], [theirs[x] for x in codes])
+            )
+        return scan
+
+    def _attack(self, threat: int, depth: int) -> Optional[List[Tuple]]:
+        """The attacker to move, see _solve.
+
+        Args:
+            threat (int): The lowest threat level the attacker may play.
+            depth (int): The attacking moves left.
+
+        Returns:
+            NoneType or List[Tuple[int, int]]: The winning sequence or None.
+        """
+        self._count_node()
+        board = self._board
+        key = (board.zobrist_hash, threat)
+        if self._failed.get(key, 0) >= depth:
+            return None
+
+        moves, blocks = [], []
+        for move, threats, defender_threats in self._scan():
+            level = max(threats)
+            if level == FIVE:
+                return [move]
+            if level >= threat:
+                strength = sum(1 for x in threats if x >= OPEN_THREE)
+                moves.append((level, strength, move))
+            if FIVE in defender_threats:
+                blocks.append(move)
+
+        if len(blocks) > 1:
+            moves = []
+        elif len(blocks) == 1:
+            moves = [x for x in moves if x[2] == blocks[0]]
+        if depth == 0:
+            moves = []
+        moves.sort(key=lambda x: x[:2], reverse=True)
+
+        for _, _, move in moves:
+            board.place(*move)
+            try:
+                sequence = self._defend(threat, depth, move)
+            finally:
+                board.cancel()
+            if sequence != None:
+                return [move] + sequence
+        self._failed[key] = depth
+        return None
+
+    def _defend(
+        self, threat: int, depth: int, move: Tuple[int, int]
+    ) -> Optional[List[Tuple]]:
+        """The defender to move right after the threat on the move.
+
+        Args:
+            threat (int): The lowest threat level the attacker may play.
+            depth (int): The attacking moves left, including the move.
+            move (Tuple[int, int]): The threat just played.
+
+        Returns:
+            NoneType or List[Tuple[int, int]]: 
+                The rest of the winning sequence, following the first reply,
+                or None if any reply refutes the threat.
+        """
+        self._count_node()
+        board = self._board
+        attacker = self._attacker
+        fives, fours = [], []
+        for reply, threats, defender_threats in self._scan():
+            if FIVE in defender_threats:
+                return None
+            if max(defender_threats) >= FOUR:
+                fours.append(reply)
+            if FIVE in threats:
+                fives.append(reply)
+
+        if len(fives) > 0:
+            # One five point is blocked, any other one wins.
+            replies = fives[:1]
+        else:
+            replies = set()
+            places = board.available_place
+            for d, (dc, dr) in enumerate(DIRECTIONS):
+                # The line code of the move is unchanged by its own piece.
+                if THREATS[attacker][board.line_code(*move, d)] < OPEN_THREE:
+                    continue
+                for step, _ in OFFSETS:
+                    reply = (move[0] + step * dc, move[1] + step * dr)
+                    if reply in places:
+                        replies.add(reply)
+            replies = sorted(replies.union(fours))
+
+        sequence = None
+        for reply in replies:
+            board.place(*reply)
+            try:
+                rest = self._attack(threat, depth - 1)
+            finally:
+                board.cancel()
+            if rest == None:
+                return None
+            if sequence == None:
+                sequence = [reply] + rest
+        return sequence
+
+
+def solve(
+    board: Board, node_limit: int = None
+) -> Optional[List[Tuple[int, int]]]:
+    """Search a forced win of the side to move, see ThreatSolver.
+
+    Args:
+        board (Board): The position to solve.
+        node_limit (int, optional): 
+            The node budget. Defaults to AI_THREAT_NODES.
+
+    Returns:
+        NoneType or List[Tuple[int, int]]: 
+            The moves of both sides to the five, or None if no win is found.
+    """
+    return ThreatSolver(board, node_limit).solve()
@@ -0,0 +1,66 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: test/bitboard_test.py
+Description: 
+    Automated test of BitBoard, which must behave as Board under any sequence
+    of places and cancels.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from src.core import DIRECTIONS, BitBoard, Board
+
+
+def assert_same(board, bit_board):
+    assert np.array_equal(board.board, bit_board.board)
+    assert list(board.kifu) == list(bit_board.kifu)
+    assert set(board.available_place) == set(bit_board.available_place)
+    assert set(board.candidates) == set(bit_board.candidates)
+    assert board.current_side == bit_board.current_side
+    assert board.winner == bit_board.winner
+    if board.winner != None:
+        assert set(board.winpath) == set(bit_board.winpath)
+    assert board.zobrist_hash == bit_board.zobrist_hash
+    assert board.canonical_hash == bit_board.canonical_hash
+    width, height = board.board_size
+    for column in range(width):
+        for row in range(height):
+            for direction in range(len(DIRECTIONS)):
+                assert board.line_code(
+                    column, row, direction
+                ) == bit_board.line_code(column, row, direction)
+                assert board.line_run(
+                    column, row, direction
+                ) == bit_board.line_run(column, row, direction)
+
+
+@pytest.mark.parametrize("board_size", [(15, 15), (9, 12), (6, 6)])
+def test_random_place_and_cancel(board_size):
+    rng = random.Random(str(board_size))
+    board, bit_board = Board(board_size), BitBoard(board_size)
+    for _ in range(300):
+        can_place = board.winner == None and len(board.available_place) > 0
+        if len(board.kifu) > 0 and (not can_place or rng.random() < 0.3):
+            board.cancel()
+            bit_board.cancel()
+        else:
+            move = rng.choice(sorted(board.available_place))
+            board.place(*move)
+            bit_board.place(*move)
+        assert_same(board, bit_board)
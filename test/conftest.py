@@ -0,0 +1,29 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: test/conftest.py
+Description: Configuration of the automated tests, run by `python -m pytest`.
+"""
+import os
+
+# The resources are found the way pyGobang.py finds them, unless given.
+os.environ.setdefault(
+    "PYGOBANG_RESPATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "res/"),
+)
+
+# The constants are imported before the other modules, as src.main does.
+import src.constants
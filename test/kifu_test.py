@@ -0,0 +1,88 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: test/kifu_test.py
+Description: 
+    Automated test of the binary kifu encoding of kifu.py, and of the 
+    migration of the pickled kifu of an older database.
+"""
+import pickle
+import sqlite3
+
+import pytest
+
+from src.core import Board
+from src.database import BoardDatabase
+from src.kifu import decode_cells, decode_kifu, encode_kifu
+
+# Black makes five in the column 7, while white plays in the column 8.
+MOVES = [(7, 3), (8, 3), (7, 4), (8, 4), (7, 5), (8, 5), (7, 6), (8, 7), (7, 7)]
+
+
+@pytest.mark.parametrize("board_size", [(15, 15), (16, 16), (20, 12)])
+def test_round_trip(board_size):
+    width, height = board_size
+    kifu = [(column, row) for column in range(width) for row in range(height)]
+    data = encode_kifu(board_size, kifu)
+    assert decode_kifu(data) == (board_size, kifu)
+    size, cells = decode_cells(data)
+    assert size == board_size
+    assert len(cells) == len(kifu)
+    assert decode_kifu(encode_kifu(board_size, [])) == (board_size, [])
+
+
+def test_unknown_version():
+    data = encode_kifu((15, 15), MOVES)
+    with pytest.raises(ValueError):
+        decode_kifu(bytes([0]) + data[1:])
+
+
+def test_migrate_pickled_rows(tmp_path):
+    # A database of the first release, with the pickled board size and kifu.
+    path = str(tmp_path / "data.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE board_table(timestamp_ TEXT PRIMARY KEY, "
+        "competitor_black TEXT, competitor_white TEXT, "
+        "board_size BLOB NOT NULL, kifu BLOB NOT NULL, winner INTEGER) "
+        "WITHOUT ROWID"
+    )
+    conn.execute(
+        "INSERT INTO board_table VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            "2022-01-01 00:00:00",
+            "alice",
+            "bob",
+            pickle.dumps((15, 15)),
+            pickle.dumps(MOVES),
+            0,
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+    database = BoardDatabase(path, position_index=False)
+    (board,) = list(database.iter_boards())
+    assert board.board_size == (15, 15)
+    assert list(board.kifu) == MOVES
+    assert board.winner == 0
+    assert board.competitor_black == "alice"
+    assert [player for player, _ in database.ratings()] == ["alice", "bob"]
+
+    board = Board((15, 15), "carol", "dave")
+    board.place(7, 7)
+    database.append(board)
+    assert len(list(database.iter_boards())) == 2
@@ -0,0 +1,80 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: test/rating_test.py
+Description: 
+    Automated test of the ratings kept by database.py, which must stay equal
+    to the ones rebuilt from all the games.
+"""
+import random
+
+import pytest
+
+from src.core import BitBoard
+from src.database import BoardDatabase
+
+PLAYERS = ["alice", "bob", "carol"]
+
+
+def make_games(count, seed=0):
+    rng = random.Random(seed)
+    games = []
+    for i in range(count):
+        board = BitBoard((9, 9), *rng.sample(PLAYERS, 2))
+        board.timestamp = "2022-01-01 00:00:00 #%09d" % i
+        while board.winner == None and len(board.available_place) > 0:
+            board.place(*rng.choice(sorted(board.available_place)))
+        games.append(board)
+    return games
+
+
+def assert_rebuilt(database):
+    ratings = database.ratings()
+    database.rebuild_ratings()
+    rebuilt = database.ratings()
+    assert [player for player, _ in ratings] == [x for x, _ in rebuilt]
+    for (_, rating), (_, expected) in zip(ratings, rebuilt):
+        assert rating == pytest.approx(expected)
+
+
+def test_ratings_in_order(tmp_path):
+    database = BoardDatabase(str(tmp_path / "data.db"), position_index=False)
+    for game in make_games(30):
+        database.append(game)
+    assert_rebuilt(database)
+
+
+def test_ratings_out_of_order(tmp_path):
+    database = BoardDatabase(str(tmp_path / "data.db"), position_index=False)
+    games = make_games(40)
+    random.Random(1).shuffle(games)
+    with database.batch(8) as writer:
+        for game in games:
+            writer.append(game)
+    assert_rebuilt(database)
+
+
+def test_ratings_after_erase(tmp_path):
+    database = BoardDatabase(str(tmp_path / "data.db"), position_index=False)
+    games = make_games(40)
+    database.append_many(games[:20])
+    database.append_many(games[30:])
+    database.append_many(games[20:30])  # Older than the last rated game.
+    database.erase(games[25].timestamp)
+    assert_rebuilt(database)
+    database.erase(games[39].timestamp)
+    database.erase(games[0].timestamp)
+    assert_rebuilt(database)
@@ -0,0 +1,81 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: test/records_test.py
+Description: Automated test of the import and the export of records.py.
+"""
+import json
+import random
+
+import pytest
+
+from src.core import BitBoard
+from src.database import BoardDatabase
+from src.records import RecordError, export_games, import_games
+
+
+def make_database(path, count=10):
+    database = BoardDatabase(str(path), position_index=False)
+    rng = random.Random(0)
+    for i in range(count):
+        board = BitBoard((15, 15) if i % 2 else (9, 11), "alice", "bob")
+        board.timestamp = "2022-01-01 00:00:00 #%09d" % i
+        for _ in range(rng.randrange(5, 60)):
+            if board.winner != None:
+                break
+            board.place(*rng.choice(sorted(board.available_place)))
+        database.append(board)
+    return database
+
+
+def games(database, timestamps=True):
+    return sorted(
+        record[0 if timestamps else 1 :] for record in database.iter_kifu()
+    )
+
+
+@pytest.mark.parametrize("name", ["games.jsonl", "games.psq.gz"])
+def test_round_trip(tmp_path, name):
+    source = make_database(tmp_path / "source.db")
+    assert export_games(source, str(tmp_path / name)) == 10
+    target = BoardDatabase(str(tmp_path / "target.db"), position_index=False)
+    assert import_games(target, str(tmp_path / name)) == (10, 0)
+    # The psq format keeps no timestamp.
+    timestamps = name.endswith(".jsonl")
+    assert games(target, timestamps) == games(source, timestamps)
+
+
+def test_bad_line(tmp_path):
+    source = make_database(tmp_path / "source.db", 3)
+    path = tmp_path / "games.jsonl"
+    export_games(source, str(path))
+    lines = path.read_text().splitlines()
+    record = json.loads(lines[1])
+    record["moves"].append(record["moves"][0])  # Taken already.
+    lines[1] = json.dumps(record)
+    lines.insert(2, "{not json")
+    path.write_text("\n".join(lines) + "\n")
+
+    target = BoardDatabase(str(tmp_path / "target.db"), position_index=False)
+    with pytest.raises(RecordError) as error:
+        import_games(target, str(path))
+    assert error.value.line == 2
+    assert len(games(target)) == 1
+
+    target = BoardDatabase(str(tmp_path / "other.db"), position_index=False)
+    errors = []
+    assert import_games(target, str(path), on_error=errors.append) == (2, 2)
+    assert [error.line for error in errors] == [2, 3]
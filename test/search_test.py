@@ -0,0 +1,55 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: test/search_test.py
+Description: Automated test of the alpha-beta search of ai.py.
+"""
+from src.ai import WIN_SCORE, TranspositionTable, search
+from src.core import Board
+
+
+def make_board(moves):
+    board = Board((15, 15))
+    for move in moves:
+        board.place(*move)
+    return board
+
+
+def test_takes_the_win():
+    board = make_board(
+        [(7, 7), (0, 0), (7, 8), (0, 2), (7, 9), (0, 4), (7, 10), (0, 6)]
+    )
+    result = search(board, max_depth=4)
+    assert result.move in [(7, 6), (7, 11)]
+    assert result.score >= WIN_SCORE - 4
+
+
+def test_blocks_the_four():
+    board = make_board(
+        [(7, 7), (7, 6), (7, 8), (0, 0), (7, 9), (0, 2), (7, 10)]
+    )
+    result = search(board, max_depth=4)
+    assert result.move == (7, 11)
+
+
+def test_table_saves_the_search():
+    board = make_board([(7, 7), (8, 8), (7, 8)])
+    table = TranspositionTable()
+    first = search(board, max_depth=3, table=table)
+    again = search(board, max_depth=3, table=table)
+    assert again.move == first.move
+    assert again.score == first.score
+    assert again.nodes < first.nodes
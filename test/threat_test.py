@@ -0,0 +1,72 @@
+"""pyGobang, a python based Gobang game.
+
+Copyright (C) 2022 Jesse Senior
+
+This program is free software: you can redistribute it and/or modify it under 
+the terms of the GNU General Public License as published by the Free Software 
+Foundation, either version 3 of the License, or (at your option) any later 
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY 
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A 
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with 
+this program.  If not, see <http://www.gnu.org/licenses/>.
+
+File: test/threat_test.py
+Description: Automated test of the threat solver of threat.py.
+"""
+from src.core import Board
+from src.threat import ThreatSolver
+
+
+def make_board(black, white):
+    board = Board((15, 15))
+    for moves in zip(black, white):
+        for move in moves:
+            board.place(*move)
+    return board
+
+
+def replay(board, sequence):
+    for move in sequence:
+        board.place(*move)
+    winner = board.winner
+    for _ in sequence:
+        board.cancel()
+    return winner
+
+
+def test_double_four():
+    # The blocked threes of the row and the column cross at (6, 7).
+    board = make_board(
+        [(3, 7), (4, 7), (5, 7), (6, 4), (6, 5), (6, 6)],
+        [(2, 7), (6, 3), (0, 14), (3, 14), (14, 0), (14, 4)],
+    )
+    kifu = board.kifu_copy
+    sequence = ThreatSolver(board).solve_vcf()
+    assert board.kifu_copy == kifu
+    assert sequence != None
+    assert sequence[0] == (6, 7)
+    assert len(sequence) == 3
+    assert replay(board, sequence) == 0
+
+
+def test_two_fours():
+    # No move makes a double four at once. The four of the row at (6, 7), or
+    # of the diagonal at (6, 4), forces a reply and makes the next four.
+    board = make_board(
+        [(3, 7), (4, 7), (5, 7), (6, 5), (6, 6), (3, 1), (4, 2), (5, 3)],
+        [(2, 7), (6, 3), (2, 0)] + [(14, row) for row in range(0, 15, 3)],
+    )
+    sequence = ThreatSolver(board).solve_vcf()
+    assert sequence != None
+    assert sequence[0] in [(6, 4), (6, 7)]
+    assert len(sequence) == 5
+    assert replay(board, sequence) == 0
+
+
+def test_no_threat():
+    board = make_board([(7, 7), (9, 9)], [(8, 8), (0, 0)])
+    assert ThreatSolver(board).solve_vcf() == None